@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import connection
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 from .models import User
@@ -18,6 +20,10 @@ class UserAdmin(BaseUserAdmin):
     )
     search_fields = ('email', 'username', 'first_name', 'last_name')
     ordering = ('-created_at',)
+    # list_display only uses local columns, so no JOINs are needed
+    list_select_related = False
+    # Avoid an unfiltered COUNT(*) on every filtered/searched changelist page
+    show_full_result_count = False
     
     fieldsets = (
         (None, {'fields': ('email', 'username', 'password')}),
@@ -36,10 +42,22 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at', 'date_joined', 'last_login')
+    raw_id_fields = ('groups', 'user_permissions')
     
-    def get_queryset(self, request):
-        """Optimize queryset for admin list view."""
-        return super().get_queryset(request).select_related()
+    def get_search_results(self, request, queryset, search_term):
+        """Search by prefix (and trigram similarity on PostgreSQL) instead of LIKE '%term%'."""
+        use_trigram = connection.vendor == 'postgresql'
+        for term in search_term.split():
+            condition = (
+                Q(email__istartswith=term) |
+                Q(username__istartswith=term) |
+                Q(first_name__istartswith=term) |
+                Q(last_name__istartswith=term)
+            )
+            if use_trigram:
+                condition |= Q(email__trigram_similar=term) | Q(username__trigram_similar=term)
+            queryset = queryset.filter(condition)
+        return queryset, False
     
     def has_delete_permission(self, request, obj=None):
         """Prevent deletion of superusers by non-superusers."""
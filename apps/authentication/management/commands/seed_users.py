@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from django.db import transaction, models
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 
 User = get_user_model()
 
@@ -47,44 +48,57 @@ class Command(BaseCommand):
         ]
 
         password = '12345678'
-        created_count = 0
-        updated_count = 0
+        emails = [user_data['email'] for user_data in users_data]
 
         with transaction.atomic():
-            for user_data in users_data:
-                email = user_data['email']
-                username = user_data['username']
-                
-                # Verificar si el usuario ya existe por email o username
-                existing_user = User.objects.filter(
-                    models.Q(email=email) | models.Q(username=username)
-                ).first()
-                
-                if existing_user:
-                    if options['force']:
-                        # Actualizar usuario existente
-                        for key, value in user_data.items():
-                            setattr(existing_user, key, value)
-                        existing_user.set_password(password)
-                        existing_user.save()
-                        updated_count += 1
-                        self.stdout.write(
-                            self.style.WARNING(f'Usuario actualizado: {email}')
-                        )
-                    else:
-                        self.stdout.write(
-                            self.style.WARNING(f'Usuario ya existe: {email} (usa --force para actualizar)')
-                        )
-                else:
-                    # Crear nuevo usuario
-                    user = User.objects.create_user(
-                        password=password,
-                        **user_data
-                    )
-                    created_count += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Usuario creado: {email}')
+            existing_emails = set(
+                User.objects.filter(email__in=emails).values_list('email', flat=True)
+            )
+
+            # Sin --force solo se insertan los usuarios que faltan
+            if options['force']:
+                pending_data = users_data
+            else:
+                pending_data = [d for d in users_data if d['email'] not in existing_emails]
+
+            if pending_data:
+                # Hashear la contraseña compartida una sola vez
+                hashed_password = make_password(password)
+                users = []
+                for user_data in pending_data:
+                    user = User(**user_data)
+                    user.password = hashed_password
+                    # bulk_create no llama a save(), así que se calcula aquí
+                    user.full_name = f"{user.first_name} {user.last_name}".strip()
+                    users.append(user)
+
+                # Un único INSERT ... ON CONFLICT sobre el índice único de email
+                if options['force']:
+                    User.objects.bulk_create(
+                        users,
+                        update_conflicts=True,
+                        unique_fields=['email'],
+                        update_fields=[
+                            'username', 'first_name', 'last_name', 'full_name',
+                            'role', 'is_staff', 'is_superuser', 'password',
+                        ],
+                        batch_size=1000,
                     )
+                else:
+                    User.objects.bulk_create(users, ignore_conflicts=True, batch_size=1000)
+
+        created_count = len(emails) - len(existing_emails)
+        updated_count = len(existing_emails) if options['force'] else 0
+
+        for email in emails:
+            if email not in existing_emails:
+                self.stdout.write(self.style.SUCCESS(f'Usuario creado: {email}'))
+            elif options['force']:
+                self.stdout.write(self.style.WARNING(f'Usuario actualizado: {email}'))
+            else:
+                self.stdout.write(
+                    self.style.WARNING(f'Usuario ya existe: {email} (usa --force para actualizar)')
+                )
 
         # Resumen
         self.stdout.write('\n' + '='*50)
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:56
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+
+
+def backfill_full_name(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    User.objects.update(full_name=Trim(Concat('first_name', Value(' '), 'last_name')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, help_text='Nombre completo (se calcula a partir de nombre y apellido)', max_length=301),
+        ),
+        migrations.RunPython(backfill_full_name, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_user_login_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'verbose_name': 'Usuario', 'verbose_name_plural': 'Usuarios'},
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at'], name='user_created_desc_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.utils.functional import cached_property
 
 
 class User(AbstractUser):
@@ -10,9 +12,18 @@ class User(AbstractUser):
         COLLABORATOR = 'collaborator', 'Colaborador'
         VIEWER = 'viewer', 'Visor'
     
+    # Roles allowed to manage projects and tasks
+    MANAGER_ROLES = frozenset({Role.ADMIN, Role.COLLABORATOR})
+    
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=150)
     last_name = models.CharField(max_length=150)
+    full_name = models.CharField(
+        max_length=301,
+        blank=True,
+        editable=False,
+        help_text='Nombre completo (se calcula a partir de nombre y apellido)'
+    )
     role = models.CharField(
         max_length=20,
         choices=Role.choices,
@@ -30,26 +41,46 @@ class User(AbstractUser):
         db_table = 'auth_user'
         verbose_name = 'Usuario'
         verbose_name_plural = 'Usuarios'
-        ordering = ['-created_at']
+        # No default ordering: callers order explicitly (UserAdmin uses the
+        # created_at index below)
+        indexes = [
+            models.Index(fields=['-created_at'], name='user_created_desc_idx'),
+            models.Index(
+                fields=['is_active', 'email'],
+                name='user_active_email_idx',
+                condition=Q(is_active=True)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
-    @property
-    def full_name(self):
-        return f"{self.first_name} {self.last_name}".strip()
+    def save(self, *args, **kwargs):
+        # Keep the stored full_name in sync with first/last name
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.full_name = f"{self.first_name} {self.last_name}".strip()
+        elif {'first_name', 'last_name'} & set(update_fields):
+            self.full_name = f"{self.first_name} {self.last_name}".strip()
+            kwargs['update_fields'] = {*update_fields, 'full_name'}
+        super().save(*args, **kwargs)
     
+    @property
     def is_admin(self):
         return self.role == self.Role.ADMIN
     
+    @property
     def is_collaborator(self):
         return self.role == self.Role.COLLABORATOR
     
+    @property
     def is_viewer(self):
         return self.role == self.Role.VIEWER
     
+    @cached_property
     def can_manage_projects(self):
-        return self.role in [self.Role.ADMIN, self.Role.COLLABORATOR]
+        return self.role in self.MANAGER_ROLES
     
+    @cached_property
     def can_manage_tasks(self):
-        return self.role in [self.Role.ADMIN, self.Role.COLLABORATOR]
+        return self.role in self.MANAGER_ROLES
@@ -1,25 +1,55 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
 
 from .models import User
+from .tokens import CacheBlacklistRefreshToken
+
+
+class PasswordPairMixin:
+    """Shared confirmation and strength checks for serializers that set a password."""
+    
+    def check_password_pair(self, password, password_confirm, field_name='new_password'):
+        """
+        Validate that both passwords match and pass the configured validators.
+        
+        Errors are reported under field_name and '<field_name>_confirm'. The
+        validator instances come from Django's memoised
+        get_default_password_validators(), so they are built once per process.
+        """
+        if password != password_confirm:
+            raise serializers.ValidationError({
+                f'{field_name}_confirm': 'Las contraseñas no coinciden.'
+            })
+        
+        try:
+            validate_password(password)
+        except ValidationError as e:
+            raise serializers.ValidationError({
+                field_name: list(e.messages)
+            })
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom JWT token serializer that includes user data."""
     
+    token_class = CacheBlacklistRefreshToken
+    
     @classmethod
     def get_token(cls, user):
         """Add custom claims to token."""
         token = super().get_token(user)
         
         # Add custom claims
-        token['user_id'] = user.id
-        token['email'] = user.email
-        token['role'] = user.role
-        token['full_name'] = user.full_name
+        token.payload.update({
+            'user_id': user.id,
+            'email': user.email,
+            'role': user.role,
+            'full_name': user.full_name,
+        })
         
         return token
     
@@ -28,21 +58,28 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data = super().validate(attrs)
         
         # Add user data to response
+        user = self.user
         data['user'] = {
-            'id': self.user.id,
-            'email': self.user.email,
-            'username': self.user.username,
-            'first_name': self.user.first_name,
-            'last_name': self.user.last_name,
-            'role': self.user.role,
-            'is_active': self.user.is_active,
-            'created_at': self.user.created_at,
+            'id': user.id,
+            'email': user.email,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'role': user.role,
+            'is_active': user.is_active,
+            'created_at': user.created_at,
         }
         
         return data
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that checks and rotates tokens against the refresh token blacklist."""
+    
+    token_class = CacheBlacklistRefreshToken
+
+
+class UserRegistrationSerializer(PasswordPairMixin, serializers.ModelSerializer):
     """Serializer for user registration."""
     
     password = serializers.CharField(
@@ -62,45 +99,38 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'password', 'password_confirm', 'role'
         )
         read_only_fields = ('id',)
+        # Uniqueness is checked once in validate() instead of per-field UniqueValidators
         extra_kwargs = {
-            'email': {'required': True},
+            'email': {'required': True, 'validators': []},
+            'username': {'validators': [UnicodeUsernameValidator()]},
             'first_name': {'required': True},
             'last_name': {'required': True},
         }
     
-    def validate_email(self, value):
-        """Validate email uniqueness."""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError(
-                "Ya existe un usuario con este email."
-            )
-        return value
-    
-    def validate_username(self, value):
-        """Validate username uniqueness."""
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError(
-                "Ya existe un usuario con este nombre de usuario."
-            )
-        return value
-    
     def validate(self, attrs):
         """Validate password confirmation and strength."""
         password = attrs.get('password')
         password_confirm = attrs.pop('password_confirm', None)
+        self.check_password_pair(password, password_confirm, 'password')
         
-        if password != password_confirm:
-            raise serializers.ValidationError({
-                'password_confirm': 'Las contraseñas no coinciden.'
-            })
+        # Validate email and username uniqueness with a single query; the
+        # UNION lets each branch use its own unique index
+        email = attrs.get('email')
+        username = attrs.get('username')
+        clashes = User.objects.filter(email=email).order_by().values_list(
+            'email', 'username'
+        ).union(
+            User.objects.filter(username=username).order_by().values_list('email', 'username')
+        )
         
-        # Validate password strength
-        try:
-            validate_password(password)
-        except ValidationError as e:
-            raise serializers.ValidationError({
-                'password': list(e.messages)
-            })
+        errors = {}
+        for existing_email, existing_username in clashes:
+            if existing_email == email:
+                errors['email'] = "Ya existe un usuario con este email."
+            if existing_username == username:
+                errors['username'] = "Ya existe un usuario con este nombre de usuario."
+        if errors:
+            raise serializers.ValidationError(errors)
         
         return attrs
     
@@ -117,15 +147,39 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user data."""
     
-    full_name = serializers.ReadOnlyField()
-    
     class Meta:
         model = User
         fields = (
             'id', 'email', 'username', 'first_name', 'last_name',
             'full_name', 'role', 'is_active', 'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'full_name', 'created_at', 'updated_at')
+
+
+class UserListSerializer(serializers.Serializer):
+    """
+    Read-only serializer with explicitly declared fields.
+    
+    Works with ``.values()`` rows (user lists) and with User instances
+    (registration response), skipping ModelSerializer field introspection.
+    """
+    
+    # Columns to request with queryset.values() for this serializer
+    VALUE_FIELDS = (
+        'id', 'email', 'username', 'first_name', 'last_name',
+        'full_name', 'role', 'is_active', 'created_at', 'updated_at'
+    )
+    
+    id = serializers.IntegerField(read_only=True)
+    email = serializers.EmailField(read_only=True)
+    username = serializers.CharField(read_only=True)
+    first_name = serializers.CharField(read_only=True)
+    last_name = serializers.CharField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    role = serializers.CharField(read_only=True)
+    is_active = serializers.BooleanField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -145,7 +199,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ChangePasswordSerializer(serializers.Serializer):
+class ChangePasswordSerializer(PasswordPairMixin, serializers.Serializer):
     """Serializer for changing user password."""
     
     old_password = serializers.CharField(
@@ -173,21 +227,9 @@ class ChangePasswordSerializer(serializers.Serializer):
     
     def validate(self, attrs):
         """Validate new password confirmation and strength."""
-        new_password = attrs.get('new_password')
-        new_password_confirm = attrs.get('new_password_confirm')
-        
-        if new_password != new_password_confirm:
-            raise serializers.ValidationError({
-                'new_password_confirm': 'Las contraseñas no coinciden.'
-            })
-        
-        # Validate password strength
-        try:
-            validate_password(new_password)
-        except ValidationError as e:
-            raise serializers.ValidationError({
-                'new_password': list(e.messages)
-            })
+        self.check_password_pair(
+            attrs.get('new_password'), attrs.get('new_password_confirm')
+        )
         
         return attrs
     
@@ -195,25 +237,19 @@ class ChangePasswordSerializer(serializers.Serializer):
         """Update user password."""
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password', 'updated_at'])
         return user
 
 
 class PasswordResetSerializer(serializers.Serializer):
     """Serializer for password reset request."""
     
+    # Existence is not validated here so the endpoint doesn't reveal which
+    # emails are registered; PasswordResetView handles unknown emails.
     email = serializers.EmailField(required=True)
-    
-    def validate_email(self, value):
-        """Validate email exists."""
-        if not User.objects.filter(email=value, is_active=True).exists():
-            raise serializers.ValidationError(
-                "No existe un usuario activo con este email."
-            )
-        return value
 
 
-class PasswordResetConfirmSerializer(serializers.Serializer):
+class PasswordResetConfirmSerializer(PasswordPairMixin, serializers.Serializer):
     """Serializer for password reset confirmation."""
     
     new_password = serializers.CharField(
@@ -228,20 +264,8 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     
     def validate(self, attrs):
         """Validate new password confirmation and strength."""
-        new_password = attrs.get('new_password')
-        new_password_confirm = attrs.get('new_password_confirm')
-        
-        if new_password != new_password_confirm:
-            raise serializers.ValidationError({
-                'new_password_confirm': 'Las contraseñas no coinciden.'
-            })
-        
-        # Validate password strength
-        try:
-            validate_password(new_password)
-        except ValidationError as e:
-            raise serializers.ValidationError({
-                'new_password': list(e.messages)
-            })
+        self.check_password_pair(
+            attrs.get('new_password'), attrs.get('new_password_confirm')
+        )
         
         return attrs
\ No newline at end of file
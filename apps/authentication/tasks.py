@@ -0,0 +1,104 @@
+import logging
+import threading
+from functools import lru_cache
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.db import connection
+from django.template.loader import get_template
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+try:
+    from celery import shared_task
+    from kombu.exceptions import OperationalError as BrokerError
+except ImportError:  # Celery is optional; see project_manager/__init__.py
+    shared_task = None
+    BrokerError = None
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _password_reset_email_template():
+    """Load the password reset email template once per process."""
+    return get_template('authentication/password_reset_email.html')
+
+
+def send_password_reset_email(email):
+    """Send the password reset email if ``email`` belongs to an active user."""
+    # Only the fields needed for the token and the template
+    user = User.objects.filter(email=email, is_active=True).only(
+        'id', 'email', 'first_name', 'password', 'last_login'
+    ).first()
+    if user is None:
+        # Unknown emails end here, outside the request, so timing reveals nothing
+        return
+    
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    reset_url = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}/"
+    
+    subject = 'Restablecer contraseña - Project Manager'
+    message = _password_reset_email_template().render({
+        'user': user,
+        'reset_url': reset_url,
+        'site_name': 'Project Manager'
+    })
+    
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        html_message=message,
+        fail_silently=False,
+    )
+
+
+def _send_password_reset_email_in_thread(email):
+    """Fallback without a Celery worker; runs after the response like the task would."""
+    try:
+        send_password_reset_email(email)
+    except Exception:
+        logger.exception('Failed to send password reset email')
+    finally:
+        # The thread's own database connection
+        connection.close()
+
+
+if shared_task is not None:
+    # Reintentos con backoff exponencial ante fallos temporales del servidor SMTP
+    send_password_reset_email_task = shared_task(
+        ignore_result=True,
+        autoretry_for=(SMTPException, OSError),
+        retry_backoff=True,
+        max_retries=5,
+    )(send_password_reset_email)
+else:
+    send_password_reset_email_task = None
+
+
+def queue_password_reset_email(email):
+    """
+    Send the password reset email out of the request cycle.
+    
+    The user lookup happens in the task too, so known and unknown emails
+    take the same time to answer. Uses the Celery worker when available;
+    otherwise, or when the broker cannot be reached, a background thread.
+    """
+    if send_password_reset_email_task is not None:
+        try:
+            send_password_reset_email_task.delay(email)
+            return
+        except BrokerError:
+            # Sin broker (p. ej. sin REDIS_URL en desarrollo) se envía en un hilo aparte
+            logger.warning('Celery broker unavailable; sending password reset email in a thread', exc_info=True)
+    threading.Thread(
+        target=_send_password_reset_email_in_thread, args=(email,), daemon=True
+    ).start()
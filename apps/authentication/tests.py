@@ -1,3 +1,90 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
-# Create your tests here.
+from .tokens import CacheBlacklistRefreshToken
+
+User = get_user_model()
+
+
+class RefreshTokenBlacklistTests(TestCase):
+    """Logged-out refresh tokens are rejected, whichever blacklist backs them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='blacklist',
+            email='blacklist@example.com',
+            password='pw12345!',
+            first_name='Black',
+            last_name='List'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _login_and_logout(self):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': self.user.email, 'password': 'pw12345!'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        tokens = response.data.get('tokens', response.data)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        response = self.client.post('/api/auth/logout/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials()
+        return tokens['refresh']
+
+    def _assert_refresh_rejected(self, refresh):
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_refresh_after_logout_is_rejected_without_shared_cache(self):
+        refresh = self._login_and_logout()
+
+        self._assert_refresh_rejected(refresh)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_database_blacklist_is_used_without_shared_cache(self):
+        refresh = self._login_and_logout()
+
+        token = CacheBlacklistRefreshToken(refresh, verify=False)
+        jti = token[api_settings.JTI_CLAIM]
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=jti).exists())
+        self.assertIsNone(cache.get(token._blacklist_cache_key()))
+
+    @override_settings(SHARED_CACHE=True)
+    def test_refresh_after_logout_is_rejected_with_shared_cache(self):
+        refresh = self._login_and_logout()
+
+        self._assert_refresh_rejected(refresh)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cache_blacklist_is_used_with_shared_cache(self):
+        refresh = self._login_and_logout()
+
+        token = CacheBlacklistRefreshToken(refresh, verify=False)
+        self.assertTrue(cache.get(token._blacklist_cache_key()))
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    @override_settings(SHARED_CACHE=True)
+    def test_rotated_refresh_token_is_rejected_with_shared_cache(self):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': self.user.email, 'password': 'pw12345!'},
+            format='json'
+        )
+        refresh = response.data.get('tokens', response.data)['refresh']
+
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self._assert_refresh_rejected(refresh)
@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+
+
+class CacheBlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist lives in the cache instead of the
+    token_blacklist tables.
+    
+    Each blacklisted ``jti`` is stored with a TTL equal to the token's
+    remaining lifetime, so entries expire on their own and no cleanup job
+    is needed.
+    
+    The cache is only used when it is shared between workers
+    (``settings.SHARED_CACHE``); with a per-process cache a token logged out
+    on one worker would still be accepted by the others, so simplejwt's
+    database blacklist is used instead.
+    """
+    
+    cache_key_prefix = 'jwt_blacklist:'
+    
+    def _blacklist_cache_key(self):
+        return f"{self.cache_key_prefix}{self.payload[api_settings.JTI_CLAIM]}"
+    
+    @classmethod
+    def for_user(cls, user):
+        if not settings.SHARED_CACHE:
+            return super().for_user(user)
+        # Sin OutstandingToken: la blacklist en caché no lo necesita
+        return super(BlacklistMixin, cls).for_user(user)
+    
+    def check_blacklist(self):
+        """Raise TokenError if this token has been blacklisted."""
+        if not settings.SHARED_CACHE:
+            return super().check_blacklist()
+        if cache.get(self._blacklist_cache_key()):
+            raise TokenError(_('Token is blacklisted'))
+    
+    def blacklist(self):
+        """Add this token to the blacklist until it expires."""
+        if not settings.SHARED_CACHE:
+            return super().blacklist()
+        ttl = int(self.payload['exp'] - time.time())
+        if ttl > 0:
+            cache.set(self._blacklist_cache_key(), True, ttl)
+    
+    def outstand(self):
+        """Called by token rotation; only the database blacklist keeps an outstanding-token list."""
+        if not settings.SHARED_CACHE:
+            return super().outstand()
+        return None
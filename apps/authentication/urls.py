@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import include, path
 from rest_framework_simplejwt.views import TokenVerifyView
 
 from .views import (
@@ -45,6 +45,8 @@ urlpatterns = [
     path('stats/', user_stats, name='user_stats'),
     
     # Endpoints de administración (solo admin)
-    path('admin/users/', AdminUserListView.as_view(), name='admin_user_list'),
-    path('admin/users/<int:id>/', AdminUserUpdateView.as_view(), name='admin_user_update'),
+    path('admin/users/', include([
+        path('', AdminUserListView.as_view(), name='admin_user_list'),
+        path('<int:id>/', AdminUserUpdateView.as_view(), name='admin_user_update'),
+    ])),
 ]
\ No newline at end of file
@@ -1,31 +1,51 @@
+import csv
+
+from adrf import generics as async_generics
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
+from django.utils.http import urlsafe_base64_decode
+from django.utils.encoding import force_str
+from django.utils import timezone
+from django.http import StreamingHttpResponse
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.db.models import Count, Q
 from drf_spectacular.utils import extend_schema
 
 from .serializers import (
     CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer,
     UserRegistrationSerializer,
     UserSerializer,
+    UserListSerializer,
     UserUpdateSerializer,
     ChangePasswordSerializer,
     PasswordResetSerializer,
     PasswordResetConfirmSerializer
 )
+from .tasks import queue_password_reset_email
+from .tokens import CacheBlacklistRefreshToken
 
 User = get_user_model()
 
+USER_PERMISSIONS_CACHE_TIMEOUT = 300  # seconds
+
+
+class _EchoBuffer:
+    """File-like object that returns written values, for streaming csv.writer output."""
+    
+    def write(self, value):
+        return value
+
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Obtener tokens JWT')
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -44,11 +64,11 @@ class CustomTokenRefreshView(TokenRefreshView):
     
     Permite renovar el token de acceso usando el token de refresh.
     """
-    pass
+    serializer_class = CustomTokenRefreshSerializer
 
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Registrar nuevo usuario')
-class RegisterView(generics.CreateAPIView):
+class RegisterView(async_generics.CreateAPIView):
     """
     Vista de registro de usuarios.
     
@@ -58,27 +78,29 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
     
-    def create(self, request, *args, **kwargs):
+    async def acreate(self, request, *args, **kwargs):
         """Create user and return tokens."""
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        user = await sync_to_async(serializer.save)()
         
         # Generate tokens for the new user
-        refresh = RefreshToken.for_user(user)
+        refresh = await sync_to_async(CacheBlacklistRefreshToken.for_user)(user)
+        # access_token builds a new token on every access; derive it once
+        access = refresh.access_token
         
         return Response({
             'message': 'Usuario registrado exitosamente.',
-            'user': UserSerializer(user).data,
+            'user': UserListSerializer(user).data,
             'tokens': {
                 'refresh': str(refresh),
-                'access': str(refresh.access_token),
+                'access': str(access),
             }
         }, status=status.HTTP_201_CREATED)
 
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Cerrar sesión')
-class LogoutView(APIView):
+class LogoutView(AsyncAPIView):
     """
     Vista para cerrar sesión de usuario.
     
@@ -86,13 +108,12 @@ class LogoutView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def post(self, request):
+    async def post(self, request):
         """Logout user by blacklisting refresh token."""
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                await sync_to_async(self._blacklist)(refresh_token)
             
             return Response({
                 'message': 'Sesión cerrada exitosamente.'
@@ -102,6 +123,12 @@ class LogoutView(APIView):
             return Response({
                 'error': 'Token inválido.'
             }, status=status.HTTP_400_BAD_REQUEST)
+    
+    @staticmethod
+    def _blacklist(refresh_token):
+        """Validate and blacklist the refresh token (blocking cache or database access)."""
+        token = CacheBlacklistRefreshToken(refresh_token)
+        token.blacklist()
 
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Perfil de usuario')
@@ -154,7 +181,7 @@ class ChangePasswordView(APIView):
 
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Solicitar restablecimiento de contraseña')
-class PasswordResetView(APIView):
+class PasswordResetView(AsyncAPIView):
     """
     Vista para solicitar restablecimiento de contraseña.
     
@@ -162,47 +189,26 @@ class PasswordResetView(APIView):
     """
     permission_classes = [permissions.AllowAny]
     
-    def post(self, request):
+    async def post(self, request):
         """Send password reset email."""
         serializer = PasswordResetSerializer(data=request.data)
         
         if serializer.is_valid():
             email = serializer.validated_data['email']
-            user = User.objects.get(email=email, is_active=True)
-            
-            # Generate reset token
-            token = default_token_generator.make_token(user)
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            
-            # Create reset URL (you'll need to implement the frontend route)
-            reset_url = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}/"
-            
-            # Send email
-            subject = 'Restablecer contraseña - Project Manager'
-            message = render_to_string('authentication/password_reset_email.html', {
-                'user': user,
-                'reset_url': reset_url,
-                'site_name': 'Project Manager'
-            })
+            success_response = Response({
+                'message': 'Se ha enviado un email con instrucciones para restablecer tu contraseña.'
+            }, status=status.HTTP_200_OK)
             
+            # La búsqueda del usuario se hace en la tarea: misma respuesta y mismo
+            # tiempo tanto si el email está registrado como si no
             try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    html_message=message,
-                    fail_silently=False,
-                )
-                
-                return Response({
-                    'message': 'Se ha enviado un email con instrucciones para restablecer tu contraseña.'
-                }, status=status.HTTP_200_OK)
-            
-            except Exception as e:
+                await sync_to_async(queue_password_reset_email)(email)
+            except Exception:
                 return Response({
                     'error': 'Error al enviar el email. Inténtalo más tarde.'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            
+            return success_response
         
         return Response(
             serializer.errors,
@@ -223,7 +229,8 @@ class PasswordResetConfirmView(APIView):
         """Confirm password reset."""
         try:
             uid = force_str(urlsafe_base64_decode(uidb64))
-            user = User.objects.get(pk=uid)
+            # Only the fields the token check and the password update touch
+            user = User.objects.only('id', 'email', 'password', 'last_login').get(pk=uid)
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             return Response({
                 'error': 'Token inválido.'
@@ -237,8 +244,11 @@ class PasswordResetConfirmView(APIView):
         serializer = PasswordResetConfirmSerializer(data=request.data)
         
         if serializer.is_valid():
-            user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            # Single UPDATE; no need to go through Model.save() for one column
+            User.objects.filter(pk=user.pk).update(
+                password=make_password(serializer.validated_data['new_password']),
+                updated_at=timezone.now()
+            )
             
             return Response({
                 'message': 'Contraseña restablecida exitosamente.'
@@ -259,7 +269,7 @@ class UserListView(generics.ListAPIView):
     Los colaboradores pueden ver usuarios de sus proyectos.
     Los visualizadores solo pueden verse a sí mismos.
     """
-    serializer_class = UserSerializer
+    serializer_class = UserListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -268,15 +278,24 @@ class UserListView(generics.ListAPIView):
         
         if user.is_admin:
             # Admins can see all users
-            return User.objects.all().order_by('first_name', 'last_name')
+            queryset = User.objects.all()
         elif user.is_collaborator:
-            # Collaborators can see users in their projects
-            return User.objects.filter(
-                project_assignments__project__assignments__user=user
-            ).distinct().order_by('first_name', 'last_name')
+            # Collaborators can see users in their projects (semijoin, no DISTINCT needed)
+            from apps.projects.models import ProjectAssignment
+            project_ids = ProjectAssignment.objects.filter(user=user).values('project_id')
+            queryset = User.objects.filter(
+                id__in=ProjectAssignment.objects.filter(
+                    project_id__in=project_ids
+                ).values('user_id')
+            )
         else:
             # Viewers can only see themselves
-            return User.objects.filter(id=user.id)
+            queryset = User.objects.filter(id=user.id)
+        
+        # Project plain rows instead of instantiating User models
+        return queryset.order_by('first_name', 'last_name').values(
+            *UserListSerializer.VALUE_FIELDS
+        )
 
 
 @extend_schema(tags=['Autenticación y Usuarios'], summary='Obtener permisos del usuario')
@@ -286,14 +305,16 @@ def user_permissions(request):
     """Get current user permissions."""
     user = request.user
     
-    permissions_data = {
-        'can_manage_projects': user.can_manage_projects(),
-        'can_manage_tasks': user.can_manage_tasks(),
+    # The role is part of the key, so a role change never serves stale permissions
+    cache_key = f'userperms:{user.pk}:{user.role}'
+    permissions_data = cache.get_or_set(cache_key, lambda: {
+        'can_manage_projects': user.can_manage_projects,
+        'can_manage_tasks': user.can_manage_tasks,
         'is_admin': user.is_admin,
         'is_collaborator': user.is_collaborator,
         'is_viewer': user.is_viewer,
         'role': user.role,
-    }
+    }, USER_PERMISSIONS_CACHE_TIMEOUT)
     
     return Response(permissions_data)
 
@@ -306,34 +327,28 @@ def user_stats(request):
     user = request.user
     
     # Import here to avoid circular imports
-    from apps.projects.models import Project, ProjectAssignment
+    from apps.projects.models import Project
     from apps.tasks.models import Task
     
-    stats = {
-        'total_projects': 0,
-        'active_projects': 0,
-        'total_tasks': 0,
-        'pending_tasks': 0,
-        'completed_tasks': 0,
-    }
-    
     if user.is_admin:
         # Admins see all stats
-        stats['total_projects'] = Project.objects.count()
-        stats['active_projects'] = Project.objects.filter(status='active').count()
-        stats['total_tasks'] = Task.objects.count()
-        stats['pending_tasks'] = Task.objects.filter(status='pending').count()
-        stats['completed_tasks'] = Task.objects.filter(status='completed').count()
+        projects = Project.objects.all()
+        tasks = Task.objects.all()
     else:
         # Other users see only their stats
-        user_projects = Project.objects.filter(assignments__user=user)
-        stats['total_projects'] = user_projects.count()
-        stats['active_projects'] = user_projects.filter(status='active').count()
-        
-        user_tasks = Task.objects.filter(assigned_to=user)
-        stats['total_tasks'] = user_tasks.count()
-        stats['pending_tasks'] = user_tasks.filter(status='pending').count()
-        stats['completed_tasks'] = user_tasks.filter(status='completed').count()
+        projects = Project.objects.filter(assignments__user=user)
+        tasks = Task.objects.filter(assigned_to=user)
+    
+    # One aggregate query per model instead of one COUNT per statistic
+    stats = projects.aggregate(
+        total_projects=Count('id', distinct=True),
+        active_projects=Count('id', filter=Q(status='active'), distinct=True),
+    )
+    stats.update(tasks.aggregate(
+        total_tasks=Count('id'),
+        pending_tasks=Count('id', filter=Q(status='pending')),
+        completed_tasks=Count('id', filter=Q(status='completed')),
+    ))
     
     return Response(stats)
 
@@ -345,20 +360,47 @@ class AdminUserListView(generics.ListAPIView):
     
     Excluye al usuario actual de la lista.
     Solo accesible para administradores.
+    Con ``?export=csv`` devuelve todos los usuarios como CSV en streaming.
     """
-    serializer_class = UserSerializer
+    serializer_class = UserListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    export_fields = ('id', 'email', 'username', 'first_name', 'last_name', 'role')
+    export_chunk_size = 2000
     
     def get_queryset(self):
         """Return all users except current user."""
         user = self.request.user
         
         # Solo administradores pueden acceder
-        if not user.is_admin():
+        if not user.is_admin:
             return User.objects.none()
         
         # Excluir al usuario actual
-        return User.objects.exclude(id=user.id).order_by('first_name', 'last_name')
+        return User.objects.exclude(id=user.id).order_by(
+            'first_name', 'last_name'
+        ).values(*UserListSerializer.VALUE_FIELDS)
+    
+    def list(self, request, *args, **kwargs):
+        """List users, or stream them as CSV when ?export=csv is given."""
+        if request.query_params.get('export') == 'csv':
+            return self.export_csv()
+        return super().list(request, *args, **kwargs)
+    
+    def export_csv(self):
+        """Stream users as CSV, reading rows in chunks to keep memory bounded."""
+        rows = self.filter_queryset(self.get_queryset()).values_list(
+            *self.export_fields
+        ).iterator(chunk_size=self.export_chunk_size)
+        writer = csv.writer(_EchoBuffer())
+        
+        def generate():
+            yield writer.writerow(self.export_fields)
+            for row in rows:
+                yield writer.writerow(row)
+        
+        response = StreamingHttpResponse(generate(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="usuarios.csv"'
+        return response
 
 
 @extend_schema(tags=['Administración'], summary='Actualizar usuario (solo admin)')
@@ -378,7 +420,7 @@ class AdminUserUpdateView(generics.UpdateAPIView):
         user = self.request.user
         
         # Solo administradores pueden acceder
-        if not user.is_admin():
+        if not user.is_admin:
             return User.objects.none()
         
         # No permitir que se modifique a sí mismo
@@ -389,7 +431,7 @@ class AdminUserUpdateView(generics.UpdateAPIView):
         user = self.request.user
         
         # Verificar que es administrador
-        if not user.is_admin():
+        if not user.is_admin:
             return Response(
                 {'error': 'No tienes permisos para realizar esta acción.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.projects.models import Project, ProjectAssignment
+
+# Versión de los datos de proyectos; forma parte de la clave de caché del dashboard
+PROJECTS_VERSION_KEY = 'dashboard:projects_version'
+
+
+def bump_projects_version():
+    """Move cached dashboard stats to a new version key."""
+    if not settings.SHARED_CACHE:
+        # Sin caché compartida las estadísticas no se cachean
+        return
+    cache.add(PROJECTS_VERSION_KEY, 0, None)
+    try:
+        cache.incr(PROJECTS_VERSION_KEY)
+    except ValueError:
+        # The key was evicted between add() and incr()
+        cache.set(PROJECTS_VERSION_KEY, 1, None)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectAssignment)
+@receiver(post_delete, sender=ProjectAssignment)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """
+    Invalidar las estadísticas del dashboard cuando cambian proyectos o asignaciones.
+    """
+    bump_projects_version()
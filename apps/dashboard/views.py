@@ -2,11 +2,62 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q, Count
 from django.utils import timezone
-from apps.projects.models import Project
+from apps.projects.models import Project, ProjectAssignment
 from drf_spectacular.utils import extend_schema
 
+from .signals import PROJECTS_VERSION_KEY
+
+DASHBOARD_STATS_CACHE_TIMEOUT = 30  # seconds
+
+# Estados que cuentan como "abiertos" para los proyectos retrasados
+OPEN_PROJECT_STATUSES = ('pending', 'in_progress')
+
+DASHBOARD_STAT_KEYS = (
+    'total_projects', 'completed_projects', 'in_progress_projects',
+    'overdue_projects', 'pending_projects', 'cancelled_projects',
+)
+
+
+def _compute_dashboard_stats(user):
+    """Aggregate the project stats visible to the given user."""
+    # Filtrar proyectos según el rol del usuario
+    if user.role == 'admin':
+        # Los administradores ven todos los proyectos
+        projects_queryset = Project.objects.all()
+    else:
+        # Sin proyectos asignados ni creados (cuentas nuevas, visores): todo es cero
+        if not (
+            ProjectAssignment.objects.filter(user=user).exists()
+            or Project.objects.filter(created_by=user).exists()
+        ):
+            return dict.fromkeys(DASHBOARD_STAT_KEYS, 0)
+        
+        # Otros usuarios solo ven proyectos donde están asignados o que han creado
+        # (semijoin: sin JOIN a asignaciones no hace falta DISTINCT)
+        projects_queryset = Project.objects.filter(
+            Q(created_by=user)
+            | Q(id__in=ProjectAssignment.objects.filter(user=user).values('project_id'))
+        )
+    
+    # Calcular todas las estadísticas en una sola consulta con agregación condicional
+    today = timezone.localdate()
+    return projects_queryset.aggregate(
+        total_projects=Count('id'),
+        completed_projects=Count('id', filter=Q(status='completed')),
+        in_progress_projects=Count('id', filter=Q(status='in_progress')),
+        # Proyectos retrasados (fecha de fin pasada y no completados)
+        overdue_projects=Count('id', filter=Q(
+            end_date__lt=today,
+            status__in=OPEN_PROJECT_STATUSES
+        )),
+        pending_projects=Count('id', filter=Q(status='pending')),
+        cancelled_projects=Count('id', filter=Q(status='cancelled')),
+    )
+
 
 @extend_schema(
     tags=['Dashboard'],
@@ -37,39 +88,17 @@ def dashboard_stats(request):
     """
     user = request.user
     
-    # Filtrar proyectos según el rol del usuario
-    if user.role == 'admin':
-        # Los administradores ven todos los proyectos
-        projects_queryset = Project.objects.all()
-    else:
-        # Otros usuarios solo ven proyectos donde están asignados o que han creado
-        projects_queryset = Project.objects.filter(
-            Q(created_by=user) | Q(assignments__user=user)
-        ).distinct()
-    
-    # Calcular estadísticas
-    total_projects = projects_queryset.count()
+    if not settings.SHARED_CACHE:
+        # Un cambio de versión en un worker no llega a la caché de los demás
+        return Response(_compute_dashboard_stats(user), status=status.HTTP_200_OK)
     
-    # Proyectos por estado
-    completed_projects = projects_queryset.filter(status='completed').count()
-    in_progress_projects = projects_queryset.filter(status='in_progress').count()
-    pending_projects = projects_queryset.filter(status='pending').count()
-    cancelled_projects = projects_queryset.filter(status='cancelled').count()
-    
-    # Proyectos retrasados (fecha de fin pasada y no completados)
-    current_date = timezone.now().date()
-    overdue_projects = projects_queryset.filter(
-        end_date__lt=current_date,
-        status__in=['pending', 'in_progress']
-    ).count()
-    
-    stats = {
-        'total_projects': total_projects,
-        'completed_projects': completed_projects,
-        'in_progress_projects': in_progress_projects,
-        'overdue_projects': overdue_projects,
-        'pending_projects': pending_projects,
-        'cancelled_projects': cancelled_projects
-    }
+    # Cachear por usuario/rol; los cambios en proyectos o asignaciones cambian la versión
+    version = cache.get(PROJECTS_VERSION_KEY, 0)
+    cache_key = f'dash:{user.pk}:{user.role}:{version}'
+    stats = cache.get_or_set(
+        cache_key,
+        lambda: _compute_dashboard_stats(user),
+        DASHBOARD_STATS_CACHE_TIMEOUT
+    )
     
     return Response(stats, status=status.HTTP_200_OK)
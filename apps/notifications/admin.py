@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db import models
+from django.utils import timezone
 
 from .models import Notification
 
@@ -15,7 +16,9 @@ class NotificationAdmin(admin.ModelAdmin):
     )
     list_filter = (
         'type', 'priority', 'is_read', 'created_at', 'read_at',
-        'recipient', 'sender'
+        # Solo usuarios que aparecen en notificaciones, no toda la tabla de usuarios
+        ('recipient', admin.RelatedOnlyFieldListFilter),
+        ('sender', admin.RelatedOnlyFieldListFilter),
     )
     search_fields = (
         'title', 'message', 
@@ -24,6 +27,7 @@ class NotificationAdmin(admin.ModelAdmin):
     )
     ordering = ('-created_at',)
     date_hierarchy = 'created_at'
+    list_select_related = ('recipient', 'sender', 'related_project', 'related_task')
     
     fieldsets = (
         ('Información Básica', {
@@ -52,12 +56,6 @@ class NotificationAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at', 'read_at')
     autocomplete_fields = ['recipient', 'sender', 'related_project', 'related_task']
     
-    def get_queryset(self, request):
-        """Optimize queryset for admin list view."""
-        return super().get_queryset(request).select_related(
-            'recipient', 'sender', 'related_project', 'related_task'
-        )
-    
     def get_list_display(self, request):
         """Customize list display based on user permissions."""
         display = list(self.list_display)
@@ -68,14 +66,17 @@ class NotificationAdmin(admin.ModelAdmin):
         return display
     
     def get_queryset(self, request):
-        """Filter queryset based on user permissions."""
-        qs = super().get_queryset(request)
+        """Filter queryset based on user permissions and join related objects."""
+        qs = super().get_queryset(request).select_related(
+            'recipient', 'sender', 'related_project', 'related_task'
+        )
         if not request.user.is_superuser:
             # Non-superusers see only their notifications or notifications they sent
+            # (both are FKs, so no DISTINCT is needed)
             qs = qs.filter(
                 models.Q(recipient=request.user) |
                 models.Q(sender=request.user)
-            ).distinct()
+            )
         return qs
     
     def has_add_permission(self, request):
@@ -99,20 +100,39 @@ class NotificationAdmin(admin.ModelAdmin):
         return True
     
     def save_model(self, request, obj, form, change):
-        """Set sender to current user if not set."""
+        """Set sender to current user if not set and sync read_at."""
         if not change and not obj.sender:  # Only for new objects without sender
             obj.sender = request.user
+        # Keep read_at in sync with is_read (read_at is read-only in the form)
+        if obj.is_read and not obj.read_at:
+            obj.read_at = timezone.now()
+        elif not obj.is_read:
+            obj.read_at = None
         super().save_model(request, obj, form, change)
     
+    def delete_model(self, request, obj):
+        """Delete notification and drop the recipient's cached unread count."""
+        super().delete_model(request, obj)
+        Notification.invalidate_unread_count(obj.recipient_id)
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk delete and drop the affected recipients' cached unread counts."""
+        recipient_ids = set(queryset.values_list('recipient_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Notification.invalidate_unread_count(*recipient_ids)
+    
     actions = ['mark_as_read', 'mark_as_unread', 'delete_selected']
     
     def mark_as_read(self, request, queryset):
         """Mark selected notifications as read."""
-        updated = 0
-        for notification in queryset:
-            if not notification.is_read:
-                notification.mark_as_read()
-                updated += 1
+        # Un único UPDATE en lugar de guardar cada notificación
+        queryset = queryset.filter(is_read=False)
+        recipient_ids = set(queryset.values_list('recipient_id', flat=True))
+        updated = queryset.update(
+            is_read=True,
+            read_at=timezone.now()
+        )
+        Notification.invalidate_unread_count(*recipient_ids)
         
         self.message_user(
             request,
@@ -122,11 +142,13 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def mark_as_unread(self, request, queryset):
         """Mark selected notifications as unread."""
-        updated = 0
-        for notification in queryset:
-            if notification.is_read:
-                notification.mark_as_unread()
-                updated += 1
+        queryset = queryset.filter(is_read=True)
+        recipient_ids = set(queryset.values_list('recipient_id', flat=True))
+        updated = queryset.update(
+            is_read=False,
+            read_at=None
+        )
+        Notification.invalidate_unread_count(*recipient_ids)
         
         self.message_user(
             request,
@@ -147,11 +169,18 @@ class NotificationAdmin(admin.ModelAdmin):
             # Limit recipient choices to users in same projects
             if 'recipient' in form.base_fields:
                 # Get users from projects where current user is assigned
+                # (semijoin over assignments, so no DISTINCT is needed)
                 from apps.authentication.models import User
+                from apps.projects.models import ProjectAssignment
+                project_ids = ProjectAssignment.objects.filter(
+                    user=request.user
+                ).values('project_id')
                 accessible_users = User.objects.filter(
-                    models.Q(project_assignments__project__assignments__user=request.user) |
+                    models.Q(id__in=ProjectAssignment.objects.filter(
+                        project_id__in=project_ids
+                    ).values('user_id')) |
                     models.Q(id=request.user.id)
-                ).distinct()
+                )
                 form.base_fields['recipient'].queryset = accessible_users
         
         return form
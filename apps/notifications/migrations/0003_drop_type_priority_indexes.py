@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_unread_partial_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notificatio_type_ea918f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notificatio_priorit_bf8ea0_idx',
+        ),
+    ]
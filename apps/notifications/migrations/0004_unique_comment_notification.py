@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:20
+
+import json
+
+from django.db import migrations, models
+import django.db.models.fields.json
+
+
+def delete_duplicate_comment_notifications(apps, schema_editor):
+    """Keep the oldest comment notification per recipient and comment."""
+    Notification = apps.get_model('notifications', 'Notification')
+    seen = set()
+    duplicate_ids = []
+    rows = Notification.objects.filter(type='comment_added').order_by('id').values_list(
+        'id', 'recipient_id', 'extra_data'
+    )
+    for pk, recipient_id, extra_data in rows.iterator():
+        comment_id = extra_data.get('comment_id') if isinstance(extra_data, dict) else None
+        if comment_id is None:
+            # extra_data->>'comment_id' is NULL: the constraint never compares these rows
+            continue
+        # Key on the text ->> produces, so 5 and "5" collide here as they do in the index
+        key = (recipient_id, comment_id if isinstance(comment_id, str) else json.dumps(comment_id))
+        if key in seen:
+            duplicate_ids.append(pk)
+        else:
+            seen.add(key)
+    Notification.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_drop_type_priority_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_comment_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(models.F('recipient'), django.db.models.fields.json.KeyTextTransform('comment_id', 'extra_data'), condition=models.Q(('type', 'comment_added')), name='uniq_comment_notif'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = (
+    ('notif_title_trgm_idx', 'title'),
+    ('notif_message_trgm_idx', 'message'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Create GIN trigram indexes for the notification ?search= filter (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON notifications_notification USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_unread_index_include_created'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
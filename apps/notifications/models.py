@@ -1,7 +1,13 @@
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.fields.json import KeyTextTransform
 from django.utils import timezone
 
+UNREAD_COUNT_CACHE_TIMEOUT = 60 * 60  # seconds; safety net, writes invalidate the key
+BULK_CREATE_BATCH_SIZE = 500
+
 
 class Notification(models.Model):
     """Model for managing user notifications."""
@@ -100,36 +106,41 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', 'is_read']),
-            models.Index(fields=['type']),
-            models.Index(fields=['priority']),
+            # Solo las no leídas: mucho más pequeño para el contador y la bandeja de no leídas
+            models.Index(
+                fields=['recipient'], condition=Q(is_read=False), include=['created_at'],
+                name='notif_unread_part_idx'
+            ),
             models.Index(fields=['created_at']),
+            # Keyset pagination of a recipient's notifications, newest first
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+        ]
+        constraints = [
+            # Un aviso por destinatario y comentario, aunque la señal se dispare dos veces
+            models.UniqueConstraint(
+                'recipient',
+                KeyTextTransform('comment_id', 'extra_data'),
+                condition=Q(type='comment_added'),
+                name='uniq_comment_notif',
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.recipient.full_name}"
     
-    def save(self, *args, **kwargs):
-        # Set read_at when is_read changes to True
-        if self.is_read and not self.read_at:
-            self.read_at = timezone.now()
-        elif not self.is_read:
-            self.read_at = None
-        
-        super().save(*args, **kwargs)
-    
     def mark_as_read(self):
         """Mark notification as read."""
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            self.save(update_fields=['is_read', 'read_at', 'updated_at'])
     
     def mark_as_unread(self):
         """Mark notification as unread."""
         if self.is_read:
             self.is_read = False
             self.read_at = None
-            self.save(update_fields=['is_read', 'read_at'])
+            self.save(update_fields=['is_read', 'read_at', 'updated_at'])
     
     @property
     def is_urgent(self):
@@ -153,42 +164,34 @@ class Notification(models.Model):
             title=f'Nueva tarea asignada: {task.name}',
             message=f'Se te ha asignado la tarea "{task.name}" en el proyecto "{task.project.name}". Fecha de vencimiento: {task.due_date.strftime("%d/%m/%Y %H:%M")}',
             related_project=task.project,
-            related_task=task,
-            extra_data={
-                'task_id': task.id,
-                'project_id': task.project.id,
-                'assigned_by_id': assigned_by.id
-            }
+            related_task=task
         )
     
     @classmethod
     def create_task_completed_notification(cls, task, completed_by):
         """Create notification for task completion."""
-        # Notify project creator and other assigned users
-        recipients = [task.project.created_by]
-        if task.created_by != task.project.created_by:
-            recipients.append(task.created_by)
+        # Notify project creator and task creator, but not the person who completed it
+        recipient_ids = cls._recipient_ids(
+            (task.project.created_by_id, task.created_by_id), exclude=completed_by.pk
+        )
         
-        notifications = []
-        for recipient in recipients:
-            if recipient != completed_by:  # Don't notify the person who completed it
-                notification = cls.objects.create(
-                    recipient=recipient,
+        # Un único INSERT y un único commit para todos los destinatarios
+        with transaction.atomic():
+            notifications = cls.objects.bulk_create([
+                cls(
+                    recipient_id=recipient_id,
                     sender=completed_by,
                     type=cls.Type.TASK_COMPLETED,
                     priority=cls.Priority.LOW,
                     title=f'Tarea completada: {task.name}',
                     message=f'{completed_by.full_name} ha completado la tarea "{task.name}" en el proyecto "{task.project.name}".',
                     related_project=task.project,
-                    related_task=task,
-                    extra_data={
-                        'task_id': task.id,
-                        'project_id': task.project.id,
-                        'completed_by_id': completed_by.id
-                    }
+                    related_task=task
                 )
-                notifications.append(notification)
-        
+                for recipient_id in recipient_ids
+            ])
+        # bulk_create no envía post_save; invalidar una sola vez tras el commit
+        transaction.on_commit(lambda: cls.invalidate_unread_count(*recipient_ids))
         return notifications
     
     @classmethod
@@ -196,59 +199,129 @@ class Notification(models.Model):
         """Create notification for project assignment."""
         return cls.objects.create(
             recipient=project_assignment.user,
-            sender=project_assignment.assigned_by,
-            type=cls.Type.PROJECT_ASSIGNED,
-            priority=cls.Priority.MEDIUM,
-            title=f'Asignado a proyecto: {project_assignment.project.name}',
-            message=f'Has sido asignado al proyecto "{project_assignment.project.name}". Fecha de inicio: {project_assignment.project.start_date.strftime("%d/%m/%Y")}',
-            related_project=project_assignment.project,
-            extra_data={
-                'project_id': project_assignment.project.id,
-                'assigned_by_id': project_assignment.assigned_by.id
-            }
+            **cls._project_assigned_fields(project_assignment.project, project_assignment.assigned_by)
         )
     
+    @classmethod
+    def create_project_assigned_notifications(cls, project, user_ids, assigned_by):
+        """Create project assignment notifications for many users (bulk-created assignments)."""
+        return cls.create_for_recipients(user_ids, **cls._project_assigned_fields(project, assigned_by))
+    
+    @classmethod
+    def _project_assigned_fields(cls, project, assigned_by):
+        return {
+            'sender': assigned_by,
+            'type': cls.Type.PROJECT_ASSIGNED,
+            'priority': cls.Priority.MEDIUM,
+            'title': f'Asignado a proyecto: {project.name}',
+            'message': f'Has sido asignado al proyecto "{project.name}". Fecha de inicio: {project.start_date.strftime("%d/%m/%Y")}',
+            'related_project': project,
+        }
+    
     @classmethod
     def create_comment_notification(cls, comment):
         """Create notification for new comment."""
         # Notify task assignee and creator (if different from comment author)
-        recipients = []
-        if comment.task.assigned_to and comment.task.assigned_to != comment.author:
-            recipients.append(comment.task.assigned_to)
-        if comment.task.created_by != comment.author and comment.task.created_by not in recipients:
-            recipients.append(comment.task.created_by)
-        
-        notifications = []
-        for recipient in recipients:
-            notification = cls.objects.create(
-                recipient=recipient,
-                sender=comment.author,
-                type=cls.Type.COMMENT_ADDED,
-                priority=cls.Priority.LOW,
-                title=f'Nuevo comentario en: {comment.task.name}',
-                message=f'{comment.author.full_name} ha agregado un comentario en la tarea "{comment.task.name}".',
-                related_project=comment.task.project,
-                related_task=comment.task,
-                extra_data={
-                    'task_id': comment.task.id,
-                    'project_id': comment.task.project.id,
-                    'comment_id': comment.id,
-                    'author_id': comment.author.id
-                }
-            )
-            notifications.append(notification)
+        recipient_ids = cls._recipient_ids(
+            (comment.task.assigned_to_id, comment.task.created_by_id), exclude=comment.author_id
+        )
         
+        # Un único INSERT y un único commit para todos los destinatarios
+        with transaction.atomic():
+            notifications = cls.objects.bulk_create([
+                cls(
+                    recipient_id=recipient_id,
+                    sender=comment.author,
+                    type=cls.Type.COMMENT_ADDED,
+                    priority=cls.Priority.LOW,
+                    title=f'Nuevo comentario en: {comment.task.name}',
+                    message=f'{comment.author.full_name} ha agregado un comentario en la tarea "{comment.task.name}".',
+                    related_project=comment.task.project,
+                    related_task=comment.task,
+                    # Task, project and author are already in related_task/related_project/sender
+                    extra_data={'comment_id': comment.id}
+                )
+                for recipient_id in recipient_ids
+            ], ignore_conflicts=True)  # already notified about this comment
+        # bulk_create no envía post_save; invalidar una sola vez tras el commit
+        transaction.on_commit(lambda: cls.invalidate_unread_count(*recipient_ids))
         return notifications
     
+    @classmethod
+    def create_for_recipients(cls, recipient_ids, **fields):
+        """Create the same notification for many recipients in batched INSERTs."""
+        recipient_ids = list(dict.fromkeys(recipient_ids))
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(recipient_id=recipient_id, **fields) for recipient_id in recipient_ids],
+                batch_size=BULK_CREATE_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+        # bulk_create no envía post_save; invalidar una sola vez tras el commit
+        transaction.on_commit(lambda: cls.invalidate_unread_count(*recipient_ids))
+        return len(recipient_ids)
+    
+    @staticmethod
+    def _recipient_ids(candidate_ids, exclude):
+        """Distinct, non-null user ids in order, skipping the acting user."""
+        seen = {None, exclude}
+        recipient_ids = []
+        for user_id in candidate_ids:
+            if user_id not in seen:
+                seen.add(user_id)
+                recipient_ids.append(user_id)
+        return recipient_ids
+    
+    @staticmethod
+    def _unread_count_cache_key(user_id):
+        return f'notifications:unread:{user_id}'
+    
+    @classmethod
+    def invalidate_unread_count(cls, *user_ids):
+        """Drop the cached unread count of the given users."""
+        cache.delete_many([cls._unread_count_cache_key(user_id) for user_id in user_ids])
+    
+    @classmethod
+    def invalidate_unread_count_before_delete(cls, condition):
+        """
+        Invalidate, after commit, the unread counts of users who have unread
+        notifications matching ``condition`` (call before a cascading delete).
+        """
+        if not settings.SHARED_CACHE:
+            # The count is not cached; skip the recipient query
+            return
+        recipient_ids = list(
+            cls.objects.filter(condition, is_read=False)
+            .values_list('recipient_id', flat=True).distinct()
+        )
+        if recipient_ids:
+            transaction.on_commit(lambda: cls.invalidate_unread_count(*recipient_ids))
+    
     @classmethod
     def get_unread_count_for_user(cls, user):
-        """Get count of unread notifications for a user."""
-        return cls.objects.filter(recipient=user, is_read=False).count()
+        """Get count of unread notifications for a user (cached until the next write)."""
+        unread = cls.objects.filter(recipient=user, is_read=False)
+        if not settings.SHARED_CACHE:
+            # Una caché por proceso no vería las invalidaciones de los demás workers
+            return unread.count()
+        
+        key = cls._unread_count_cache_key(user.pk)
+        count = cache.get(key)
+        if count is None:
+            count = unread.count()
+            cache.set(key, count, UNREAD_COUNT_CACHE_TIMEOUT)
+        return count
     
     @classmethod
     def mark_all_as_read_for_user(cls, user):
         """Mark all notifications as read for a user."""
-        return cls.objects.filter(recipient=user, is_read=False).update(
+        unread = cls.objects.filter(recipient=user, is_read=False)
+        # Index-only probe on notif_unread_part_idx; skip the UPDATE when nothing is unread
+        if not unread.exists():
+            return 0
+        updated = unread.update(
             is_read=True,
             read_at=timezone.now()
         )
+        cls.invalidate_unread_count(user.pk)
+        return updated
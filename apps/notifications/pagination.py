@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination for notification lists, newest first, opt-in.
+    
+    Each cursor page is a ``WHERE created_at < <cursor>`` range read instead
+    of an OFFSET scan, so deep pages cost the same as the first one. Clients
+    opt in with ``?pagination=cursor`` on the first request and then follow
+    ``next``/``previous`` (which carry ``?cursor=``). Any other request keeps
+    the page-number response with ``count``.
+    """
+    
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    opt_in_query_param = 'pagination'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param in params or params.get(self.opt_in_query_param) == 'cursor':
+            self._page_number_paginator = None
+            return super().paginate_queryset(queryset, request, view)
+        self._page_number_paginator = PageNumberPagination()
+        return self._page_number_paginator.paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        if self._page_number_paginator is not None:
+            return self._page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+    
+    def get_paginated_response_schema(self, schema):
+        # The default contract is still the page-number envelope
+        return PageNumberPagination().get_paginated_response_schema(schema)
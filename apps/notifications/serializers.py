@@ -1,14 +1,47 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.timesince import timesince
+from django.utils.translation import get_language
 
 from .models import Notification
 from apps.authentication.serializers import UserSerializer
+from apps.projects.models import Project
+from apps.tasks.models import Task
 
 User = get_user_model()
 
+# Below four weeks timesince() output depends only on the elapsed minutes
+TIME_SINCE_CACHE_LIMIT = timedelta(weeks=4)
+
+
+@lru_cache(maxsize=4096)
+def _time_since_minutes(minutes, language):
+    """timesince() text for an elapsed time of whole minutes, per active language."""
+    end = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+    return timesince(end - timedelta(minutes=minutes), end)
+
+
+class TimeSinceMixin:
+    """Human-readable age of ``created_at``, sharing one ``now`` per response."""
+    
+    def get_time_since(self, obj):
+        """Get human-readable time since notification was created."""
+        # The context dict is shared by every row of a many=True serializer
+        now = self.context.get('now')
+        if now is None:
+            now = self.context['now'] = timezone.now()
+        elapsed = now - obj.created_at
+        if timedelta(0) <= elapsed < TIME_SINCE_CACHE_LIMIT:
+            return _time_since_minutes(int(elapsed.total_seconds()) // 60, get_language())
+        return timesince(obj.created_at, now)
 
-class NotificationSerializer(serializers.ModelSerializer):
+
+class NotificationSerializer(TimeSinceMixin, serializers.ModelSerializer):
     """Serializer for notifications."""
     
     recipient = UserSerializer(read_only=True)
@@ -25,19 +58,13 @@ class NotificationSerializer(serializers.ModelSerializer):
         read_only_fields = (
             'id', 'recipient', 'sender', 'created_at', 'updated_at'
         )
-    
 
-    
-    def get_time_since(self, obj):
-        """Get human-readable time since notification was created."""
-        from django.utils.timesince import timesince
-        return timesince(obj.created_at)
 
-
-class NotificationListSerializer(serializers.ModelSerializer):
+class NotificationListSerializer(TimeSinceMixin, serializers.ModelSerializer):
     """Simplified serializer for notification lists."""
     
-    sender_name = serializers.CharField(source='sender.get_full_name', read_only=True)
+    # Annotated by the list querysets from the sender's stored full_name
+    sender_name = serializers.CharField(source='sender_full_name', read_only=True)
     time_since = serializers.SerializerMethodField()
     
     class Meta:
@@ -46,13 +73,6 @@ class NotificationListSerializer(serializers.ModelSerializer):
             'id', 'sender_name', 'type', 'priority', 'title',
             'message', 'is_read', 'created_at', 'time_since'
         )
-    
-
-    
-    def get_time_since(self, obj):
-        """Get human-readable time since notification was created."""
-        from django.utils.timesince import timesince
-        return timesince(obj.created_at)
 
 
 class NotificationCreateSerializer(serializers.ModelSerializer):
@@ -73,9 +93,7 @@ class NotificationCreateSerializer(serializers.ModelSerializer):
     
     def validate_recipient_id(self, value):
         """Validate recipient exists and is active."""
-        try:
-            user = User.objects.get(id=value, is_active=True)
-        except User.DoesNotExist:
+        if not User.objects.filter(id=value, is_active=True).exists():
             raise serializers.ValidationError(
                 "Usuario destinatario no encontrado o inactivo."
             )
@@ -83,22 +101,16 @@ class NotificationCreateSerializer(serializers.ModelSerializer):
     
     def validate_sender_id(self, value):
         """Validate sender exists and is active."""
-        if value is not None:
-            try:
-                user = User.objects.get(id=value, is_active=True)
-            except User.DoesNotExist:
-                raise serializers.ValidationError(
-                    "Usuario remitente no encontrado o inactivo."
-                )
+        if value is not None and not User.objects.filter(id=value, is_active=True).exists():
+            raise serializers.ValidationError(
+                "Usuario remitente no encontrado o inactivo."
+            )
         return value
     
     def validate_related_project_id(self, value):
         """Validate project exists."""
         if value is not None:
-            from apps.projects.models import Project
-            try:
-                Project.objects.get(id=value)
-            except Project.DoesNotExist:
+            if not Project.objects.filter(id=value).exists():
                 raise serializers.ValidationError(
                     "Proyecto no encontrado."
                 )
@@ -107,10 +119,7 @@ class NotificationCreateSerializer(serializers.ModelSerializer):
     def validate_related_task_id(self, value):
         """Validate task exists."""
         if value is not None:
-            from apps.tasks.models import Task
-            try:
-                Task.objects.get(id=value)
-            except Task.DoesNotExist:
+            if not Task.objects.filter(id=value).exists():
                 raise serializers.ValidationError(
                     "Tarea no encontrada."
                 )
@@ -155,12 +164,52 @@ class NotificationCreateSerializer(serializers.ModelSerializer):
         return Notification.objects.create(**validated_data)
 
 
+class NotificationBulkCreateSerializer(serializers.ModelSerializer):
+    """Serializer for sending the same notification to many users."""
+    
+    recipient_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=5000,
+        help_text="Lista de IDs de usuarios destinatarios."
+    )
+    
+    class Meta:
+        model = Notification
+        fields = (
+            'recipient_ids', 'type', 'priority', 'title', 'message', 'extra_data'
+        )
+    
+    def validate_recipient_ids(self, value):
+        """Validate all recipients exist and are active."""
+        requested_ids = set(value)
+        recipients = User.objects.filter(id__in=requested_ids, is_active=True)
+        
+        # Happy path: a single COUNT; only list the ids when some are missing
+        if recipients.count() != len(requested_ids):
+            existing_ids = set(recipients.values_list('id', flat=True))
+            invalid_ids = requested_ids - existing_ids
+            raise serializers.ValidationError(
+                f"Usuarios destinatarios no encontrados o inactivos: {list(invalid_ids)}"
+            )
+        return value
+
+
 class NotificationUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating notifications (mainly for marking as read)."""
     
     class Meta:
         model = Notification
         fields = ('is_read',)
+    
+    def update(self, instance, validated_data):
+        """Update read state, keeping read_at in sync."""
+        if 'is_read' in validated_data:
+            if validated_data['is_read']:
+                instance.mark_as_read()
+            else:
+                instance.mark_as_unread()
+        return instance
 
 
 class BulkNotificationUpdateSerializer(serializers.Serializer):
@@ -177,15 +226,16 @@ class BulkNotificationUpdateSerializer(serializers.Serializer):
         """Validate notification IDs exist and belong to the user."""
         if value:
             user = self.context['request'].user
-            existing_ids = set(
-                Notification.objects.filter(
-                    id__in=value,
-                    recipient=user
-                ).values_list('id', flat=True)
+            requested_ids = set(value)
+            notifications = Notification.objects.filter(
+                id__in=requested_ids,
+                recipient=user
             )
             
-            invalid_ids = set(value) - existing_ids
-            if invalid_ids:
+            # Happy path: a single COUNT; only list the ids when some are missing
+            if notifications.count() != len(requested_ids):
+                existing_ids = set(notifications.values_list('id', flat=True))
+                invalid_ids = requested_ids - existing_ids
                 raise serializers.ValidationError(
                     f"Notificaciones no encontradas o sin acceso: {list(invalid_ids)}"
                 )
@@ -201,6 +251,7 @@ class NotificationStatsSerializer(serializers.Serializer):
     read_notifications = serializers.IntegerField()
     notifications_today = serializers.IntegerField()
     notifications_this_week = serializers.IntegerField()
+    notifications_by_type = serializers.DictField(child=serializers.IntegerField())
     recent_notifications = NotificationListSerializer(many=True)
 
 
@@ -1,13 +1,33 @@
-from django.db.models.signals import post_save, m2m_changed
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from apps.projects.models import ProjectAssignment
+from apps.projects.models import Project, ProjectAssignment
 from apps.tasks.models import Task, TaskComment
 from .models import Notification
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+
+def _notify_on_commit(create_notification, *args):
+    """
+    Crear la notificación después del commit, fuera de la escritura original.
+    """
+    def run():
+        try:
+            create_notification(*args)
+        except Exception:
+            # Log error but don't fail the originating request
+            logger.exception('Error creating notification via %s', create_notification.__name__)
+    
+    transaction.on_commit(run)
+
 
 @receiver(post_save, sender=ProjectAssignment)
 def create_project_assignment_notification(sender, instance, created, **kwargs):
@@ -15,11 +35,7 @@ def create_project_assignment_notification(sender, instance, created, **kwargs):
     Crear notificación cuando un usuario es asignado a un proyecto.
     """
     if created:
-        try:
-            Notification.create_project_assigned_notification(instance)
-        except Exception as e:
-            # Log error but don't fail the assignment
-            print(f"Error creating project assignment notification: {e}")
+        _notify_on_commit(Notification.create_project_assigned_notification, instance)
 
 
 @receiver(post_save, sender=Task)
@@ -28,13 +44,9 @@ def create_task_notification(sender, instance, created, **kwargs):
     Crear notificación cuando se crea una nueva tarea.
     """
     if created and instance.assigned_to:
-        try:
-            # Obtener quien creó la tarea (puede ser el usuario actual o el creador del proyecto)
-            assigned_by = getattr(instance, '_assigned_by', instance.created_by)
-            Notification.create_task_assigned_notification(instance, assigned_by)
-        except Exception as e:
-            # Log error but don't fail the task creation
-            print(f"Error creating task assignment notification: {e}")
+        # Obtener quien creó la tarea (puede ser el usuario actual o el creador del proyecto)
+        assigned_by = getattr(instance, '_assigned_by', instance.created_by)
+        _notify_on_commit(Notification.create_task_assigned_notification, instance, assigned_by)
 
 
 @receiver(post_save, sender=TaskComment)
@@ -43,8 +55,24 @@ def create_comment_notification(sender, instance, created, **kwargs):
     Crear notificación cuando se agrega un comentario a una tarea.
     """
     if created:
-        try:
-            Notification.create_comment_notification(instance)
-        except Exception as e:
-            # Log error but don't fail the comment creation
-            print(f"Error creating comment notification: {e}")
\ No newline at end of file
+        _notify_on_commit(Notification.create_comment_notification, instance)
+
+
+@receiver(post_save, sender=Notification)
+def invalidate_unread_notification_count(sender, instance, **kwargs):
+    """
+    Invalidar el contador de no leídas del destinatario al crear o guardar una notificación.
+    """
+    Notification.invalidate_unread_count(instance.recipient_id)
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_unread_count_on_cascade(sender, instance, **kwargs):
+    """
+    Invalidar el contador de no leídas de quienes pierden notificaciones por el borrado en cascada.
+    """
+    # Una sola consulta para el proyecto y todas sus tareas; los borrados de
+    # tareas sueltas se cubren en TaskQuerySet.delete()/Task.delete()
+    Notification.invalidate_unread_count_before_delete(
+        Q(related_project=instance) | Q(related_task__project=instance)
+    )
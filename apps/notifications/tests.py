@@ -1,3 +1,133 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+from .models import Notification
+
+User = get_user_model()
+
+
+def create_user(username, **extra):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='pw12345!',
+        first_name=username.title(),
+        last_name='Test',
+        **extra
+    )
+
+
+class CommentNotificationTests(TestCase):
+    """One comment_added notification per recipient and comment (uniq_comment_notif)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator')
+        cls.author = create_user('author', role=User.Role.ADMIN)
+        today = timezone.localdate()
+        project = Project.objects.create(
+            name='Proyecto', description='Descripción', created_by=cls.creator,
+            start_date=today, end_date=today + timedelta(days=30)
+        )
+        cls.task = Task.objects.create(
+            name='Tarea', description='Descripción', project=project,
+            created_by=cls.creator, due_date=timezone.now() + timedelta(days=1)
+        )
+        cls.comment = TaskComment.objects.create(task=cls.task, author=cls.author, content='Hola')
+
+    def test_duplicate_comment_notification_is_ignored(self):
+        Notification.create_comment_notification(self.comment)
+        Notification.create_comment_notification(self.comment)
+
+        notifications = Notification.objects.filter(type=Notification.Type.COMMENT_ADDED)
+        self.assertEqual(notifications.count(), 1)
+        notification = notifications.get()
+        self.assertEqual(notification.recipient, self.creator)
+        self.assertEqual(notification.extra_data, {'comment_id': self.comment.id})
+
+    def test_each_comment_gets_its_own_notification(self):
+        other_comment = TaskComment.objects.create(task=self.task, author=self.author, content='Otra')
+        Notification.create_comment_notification(self.comment)
+        Notification.create_comment_notification(other_comment)
+
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.creator, type=Notification.Type.COMMENT_ADDED).count(),
+            2
+        )
+
+    def test_notifications_without_comment_id_are_not_deduped(self):
+        for extra_data in ({}, {}, {'comment_id': None}):
+            Notification.objects.create(
+                recipient=self.creator,
+                type=Notification.Type.COMMENT_ADDED,
+                title='Nuevo comentario',
+                message='Sin comment_id',
+                extra_data=extra_data
+            )
+
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.creator, type=Notification.Type.COMMENT_ADDED).count(),
+            3
+        )
+
+
+class NotificationPaginationTests(TestCase):
+    """Page-number envelope by default; keyset pages with ?pagination=cursor."""
+
+    url = '/api/notifications/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('reader')
+        Notification.objects.bulk_create([
+            Notification(recipient=cls.user, title=f'Aviso {i}', message='Mensaje')
+            for i in range(25)
+        ])
+        # Same created_at for a block of rows: the cursor order must fall back to -id
+        tied = list(Notification.objects.order_by('id').values_list('id', flat=True)[:10])
+        Notification.objects.filter(id__in=tied).update(created_at=timezone.now() - timedelta(hours=1))
+        cls.expected_ids = list(
+            Notification.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_default_response_uses_page_numbers(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'count', 'next', 'previous', 'results'})
+        self.assertEqual(response.data['count'], 25)
+        self.assertIsNone(response.data['previous'])
+        self.assertIn('page=2', response.data['next'])
+        self.assertEqual(len(response.data['results']), 20)
+
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(response.data['count'], 25)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_cursor_opt_in_pages_in_stable_order(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        seen_ids = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            self.assertIn('cursor=', response.data['next'])
+            response = self.client.get(response.data['next'])
+            self.assertEqual(response.status_code, 200)
+            seen_ids.extend(row['id'] for row in response.data['results'])
 
-# Create your tests here.
+        self.assertEqual(seen_ids, self.expected_ids)
@@ -1,20 +1,44 @@
+import json
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Count, F
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import timedelta
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 from .models import Notification
+from .pagination import NotificationCursorPagination
 from .serializers import (
     NotificationSerializer, NotificationListSerializer,
-    NotificationCreateSerializer, NotificationUpdateSerializer,
+    NotificationCreateSerializer, NotificationBulkCreateSerializer, NotificationUpdateSerializer,
     BulkNotificationUpdateSerializer, NotificationStatsSerializer,
     NotificationPreferencesSerializer
 )
+from apps.authentication.serializers import UserSerializer
 from apps.shared.permissions import IsNotificationRecipient
 
+# Columns read by NotificationListSerializer (skips extra_data and the related FKs)
+LIST_ONLY_FIELDS = (
+    'id', 'type', 'priority', 'title', 'message', 'is_read', 'created_at',
+)
+
+
+# Detail views nest both users through UserSerializer; skip the password and other auth columns
+DETAIL_ONLY_FIELDS = (
+    *(field.name for field in Notification._meta.concrete_fields),
+    *(f'{relation}__{field}' for relation in ('recipient', 'sender') for field in UserSerializer.Meta.fields),
+)
+
+
+def _for_list(queryset):
+    """Trim a notification queryset to what NotificationListSerializer reads."""
+    # The sender's stored full_name comes back as one joined column, no sender instance
+    return queryset.only(*LIST_ONLY_FIELDS).annotate(sender_full_name=F('sender__full_name'))
+
 
 @extend_schema_view(
     list=extend_schema(tags=['Sistema de Notificaciones'], summary='Listar notificaciones'),
@@ -30,9 +54,16 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     Permite a los usuarios ver y gestionar sus notificaciones.
     Los usuarios solo pueden acceder a sus propias notificaciones.
+    Con ``?export=json`` los superusuarios obtienen el listado completo en streaming.
     """
     
     permission_classes = [permissions.IsAuthenticated, IsNotificationRecipient]
+    pagination_class = NotificationCursorPagination
+    export_fields = (
+        'id', 'recipient_id', 'sender_id', 'type', 'priority', 'title',
+        'message', 'is_read', 'read_at', 'created_at'
+    )
+    export_chunk_size = 2000
     
     class Meta:
         tags = ['Notificaciones']
@@ -42,11 +73,14 @@ class NotificationViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.is_superuser:
-            return Notification.objects.all().select_related('recipient')
+            queryset = Notification.objects.all()
+        else:
+            queryset = Notification.objects.filter(recipient=user)
         
-        return Notification.objects.filter(
-            recipient=user
-        ).select_related('recipient')
+        # The list serializer only reads the sender's name; the detail one nests both users.
+        if self.action == 'list':
+            return _for_list(queryset)
+        return queryset.select_related('recipient', 'sender').only(*DETAIL_ONLY_FIELDS)
     
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -60,38 +94,40 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """List notifications with filtering options."""
-        queryset = self.get_queryset()
+        # Collect the optional filters into one Q and apply them with a single filter() call
+        filters = Q()
         
         # Filter by read status
         is_read = request.query_params.get('is_read')
         if is_read is not None:
             is_read_bool = is_read.lower() in ['true', '1', 'yes']
-            queryset = queryset.filter(is_read=is_read_bool)
+            filters &= Q(is_read=is_read_bool)
         
         # Filter by notification type
         notification_type = request.query_params.get('type')
         if notification_type:
-            queryset = queryset.filter(notification_type=notification_type)
+            filters &= Q(type=notification_type)
         
         # Filter by date range
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
         
         if date_from:
-            queryset = queryset.filter(created_at__date__gte=date_from)
+            filters &= Q(created_at__date__gte=date_from)
         if date_to:
-            queryset = queryset.filter(created_at__date__lte=date_to)
+            filters &= Q(created_at__date__lte=date_to)
         
         # Search in title and message
         search = request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(message__icontains=search)
-            )
+            filters &= Q(title__icontains=search) | Q(message__icontains=search)
+        
+        queryset = self.get_queryset().filter(filters)
         
-        # Order by creation date (newest first)
-        queryset = queryset.order_by('-created_at')
+        if request.query_params.get('export') == 'json' and request.user.is_superuser:
+            return self.export_json(queryset)
         
+        # Newest first; the cursor paginator applies ('-created_at', '-id')
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -100,6 +136,22 @@ class NotificationViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    def export_json(self, queryset):
+        """Stream notifications as a JSON array, reading rows in chunks to keep memory bounded."""
+        rows = queryset.order_by('-created_at', '-id').values(
+            *self.export_fields
+        ).iterator(chunk_size=self.export_chunk_size)
+        
+        def generate():
+            yield '['
+            for index, row in enumerate(rows):
+                yield (',' if index else '') + json.dumps(row, cls=DjangoJSONEncoder)
+            yield ']'
+        
+        response = StreamingHttpResponse(generate(), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="notificaciones.json"'
+        return response
+    
     def create(self, request, *args, **kwargs):
         """Create notification (admin only)."""
         if not request.user.is_superuser:
@@ -110,42 +162,49 @@ class NotificationViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    @extend_schema(tags=['Sistema de Notificaciones'], summary='Marcar notificación como leída')
-    @action(detail=True, methods=['patch'])
-    def mark_as_read(self, request, pk=None):
-        """Mark notification as read."""
+    def perform_destroy(self, instance):
+        """Delete notification and drop the recipient's cached unread count."""
+        recipient_id = instance.recipient_id
+        instance.delete()
+        Notification.invalidate_unread_count(recipient_id)
+    
+    def _set_read_state(self, request, is_read):
+        """Toggle a notification's read state with one UPDATE instead of a full save()."""
+        # get_object() keeps the get_queryset() scoping and the object permissions (superusers included)
         notification = self.get_object()
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
         
+        now = timezone.now()
+        read_at = now if is_read else None
+        self.get_queryset().filter(pk=notification.pk).update(
+            is_read=is_read,
+            read_at=read_at,
+            updated_at=now
+        )
+        Notification.invalidate_unread_count(notification.recipient_id)
+        
+        notification.is_read = is_read
+        notification.read_at = read_at
+        notification.updated_at = now
         serializer = NotificationSerializer(notification)
         return Response(serializer.data)
     
+    @extend_schema(tags=['Sistema de Notificaciones'], summary='Marcar notificación como leída')
+    @action(detail=True, methods=['patch'])
+    def mark_as_read(self, request, pk=None):
+        """Mark notification as read. For several at once use bulk_update."""
+        return self._set_read_state(request, is_read=True)
+    
     @extend_schema(tags=['Sistema de Notificaciones'], summary='Marcar notificación como no leída')
     @action(detail=True, methods=['patch'])
     def mark_as_unread(self, request, pk=None):
-        """Mark notification as unread."""
-        notification = self.get_object()
-        notification.is_read = False
-        notification.read_at = None
-        notification.save()
-        
-        serializer = NotificationSerializer(notification)
-        return Response(serializer.data)
+        """Mark notification as unread. For several at once use bulk_update."""
+        return self._set_read_state(request, is_read=False)
     
     @extend_schema(tags=['Sistema de Notificaciones'], summary='Marcar todas las notificaciones como leídas')
     @action(detail=False, methods=['patch'])
     def mark_all_as_read(self, request):
         """Mark all user notifications as read."""
-        user = request.user
-        updated_count = Notification.objects.filter(
-            recipient=user,
-            is_read=False
-        ).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        updated_count = Notification.mark_all_as_read_for_user(request.user)
         
         return Response({
             'message': f'{updated_count} notificaciones marcadas como leídas.',
@@ -162,21 +221,23 @@ class NotificationViewSet(viewsets.ModelViewSet):
         )
         
         if serializer.is_valid():
-            notification_ids = serializer.validated_data['notification_ids']
-            is_read = serializer.validated_data.get('is_read')
-            
-            # Filter notifications to only user's own
-            queryset = self.get_queryset().filter(id__in=notification_ids)
+            notification_ids = serializer.validated_data.get('notification_ids')
+            is_read = serializer.validated_data['is_read']
             
-            update_data = {}
-            if is_read is not None:
-                update_data['is_read'] = is_read
-                if is_read:
-                    update_data['read_at'] = timezone.now()
-                else:
-                    update_data['read_at'] = None
+            # Filter notifications to only user's own; rows already in the target state are left alone
+            queryset = Notification.objects.filter(recipient=request.user).exclude(is_read=is_read)
+            # Only an omitted notification_ids means "all"; an empty list updates nothing
+            if notification_ids is not None:
+                queryset = queryset.filter(id__in=notification_ids)
             
-            updated_count = queryset.update(**update_data)
+            # Un único UPDATE; su contador de filas es el updated_count
+            now = timezone.now()
+            updated_count = queryset.update(
+                is_read=is_read,
+                read_at=now if is_read else None,
+                updated_at=now
+            )
+            Notification.invalidate_unread_count(request.user.pk)
             
             return Response({
                 'message': f'{updated_count} notificaciones actualizadas.',
@@ -185,6 +246,35 @@ class NotificationViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @extend_schema(
+        tags=['Sistema de Notificaciones'],
+        summary='Crear una notificación para varios usuarios',
+        request=NotificationBulkCreateSerializer
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create the same notification for many recipients (admin only)."""
+        if not request.user.is_superuser:
+            return Response(
+                {'error': 'Solo los administradores pueden crear notificaciones.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = NotificationBulkCreateSerializer(data=request.data)
+        if serializer.is_valid():
+            fields = dict(serializer.validated_data)
+            recipient_ids = fields.pop('recipient_ids')
+            created_count = Notification.create_for_recipients(
+                recipient_ids, sender=request.user, **fields
+            )
+            
+            return Response({
+                'message': f'{created_count} notificaciones creadas.',
+                'created_count': created_count
+            }, status=status.HTTP_201_CREATED)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
     @extend_schema(tags=['Sistema de Notificaciones'], summary='Eliminar notificaciones leídas')
     @action(detail=False, methods=['delete'])
     def delete_read(self, request):
@@ -207,10 +297,15 @@ class NotificationViewSet(viewsets.ModelViewSet):
         user = request.user
         cutoff_date = timezone.now() - timedelta(days=30)
         
+        # Notification has no inbound FKs nor delete signals, so Django fast-deletes this
+        # as one DELETE ... WHERE over the (recipient, created_at) index, without loading rows.
+        # Keep it that way: a pre/post_delete receiver on Notification would turn it into
+        # a SELECT of every row followed by batched deletes.
         deleted_count, _ = Notification.objects.filter(
             recipient=user,
             created_at__lt=cutoff_date
         ).delete()
+        Notification.invalidate_unread_count(user.pk)
         
         return Response({
             'message': f'{deleted_count} notificaciones antiguas eliminadas.',
@@ -221,11 +316,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications."""
-        user = request.user
-        count = Notification.objects.filter(
-            recipient=user,
-            is_read=False
-        ).count()
+        count = Notification.get_unread_count_for_user(request.user)
         
         return Response({'unread_count': count})
     
@@ -234,9 +325,9 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def recent(self, request):
         """Get recent notifications (last 10)."""
         user = request.user
-        notifications = Notification.objects.filter(
+        notifications = _for_list(Notification.objects.filter(
             recipient=user
-        ).order_by('-created_at')[:10]
+        )).order_by('-created_at')[:10]
         
         serializer = NotificationListSerializer(notifications, many=True)
         return Response(serializer.data)
@@ -246,10 +337,10 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def unread(self, request):
         """Get unread notifications for the user."""
         user = request.user
-        notifications = Notification.objects.filter(
+        notifications = _for_list(Notification.objects.filter(
             recipient=user,
             is_read=False
-        ).order_by('-created_at')
+        )).order_by('-created_at')
         
         # Aplicar paginación si es necesario
         page = self.paginate_queryset(notifications)
@@ -260,38 +351,43 @@ class NotificationViewSet(viewsets.ModelViewSet):
         serializer = NotificationListSerializer(notifications, many=True)
         return Response(serializer.data)
     
-    @extend_schema(tags=['Sistema de Notificaciones'], summary='Obtener estadísticas de notificaciones')
+    @extend_schema(
+        tags=['Sistema de Notificaciones'],
+        summary='Obtener estadísticas de notificaciones',
+        responses=NotificationStatsSerializer
+    )
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get notification statistics."""
         user = request.user
         notifications = Notification.objects.filter(recipient=user)
+        week_ago = timezone.now() - timedelta(days=7)
         
-        total_notifications = notifications.count()
-        unread_notifications = notifications.filter(is_read=False).count()
-        read_notifications = notifications.filter(is_read=True).count()
-        
-        # Notifications by type
-        notifications_by_type = dict(
-            notifications.values('notification_type').annotate(
-                count=Count('id')
-            ).values_list('notification_type', 'count')
+        # Todos los contadores, incluido el desglose por tipo, en una sola consulta
+        counts = notifications.aggregate(
+            total_notifications=Count('*'),
+            unread_notifications=Count('id', filter=Q(is_read=False)),
+            notifications_today=Count('id', filter=Q(created_at__date=timezone.localdate())),
+            notifications_this_week=Count('id', filter=Q(created_at__gte=week_ago)),
+            **{
+                f'type__{value}': Count('id', filter=Q(type=value))
+                for value in Notification.Type.values
+            }
         )
         
-        # Recent activity (last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_notifications = notifications.filter(
-            created_at__gte=week_ago
-        ).count()
+        # Notifications by type (only the types the user actually has)
+        notifications_by_type = {}
+        for value in Notification.Type.values:
+            count = counts.pop(f'type__{value}')
+            if count:
+                notifications_by_type[value] = count
         
         stats_data = {
-            'total_notifications': total_notifications,
-            'unread_notifications': unread_notifications,
-            'read_notifications': read_notifications,
+            **counts,
+            'read_notifications': counts['total_notifications'] - counts['unread_notifications'],
             'notifications_by_type': notifications_by_type,
-            'recent_notifications': recent_notifications
+            'recent_notifications': _for_list(notifications).order_by('-created_at')[:5],
         }
         
-        serializer = NotificationStatsSerializer(data=stats_data)
-        serializer.is_valid()
+        serializer = NotificationStatsSerializer(stats_data)
         return Response(serializer.data)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectassignment',
+            index=models.Index(fields=['user', 'project'], name='assignment_user_project_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_assignment_user_project_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='project',
+            name='projects_pr_end_dat_f8a25b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['end_date', 'status'], name='projects_pr_end_dat_eb9489_idx'),
+        ),
+    ]
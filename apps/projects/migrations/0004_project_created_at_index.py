@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_end_date_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_at'], name='projects_pr_created_775fe7_idx'),
+        ),
+    ]
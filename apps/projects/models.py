@@ -50,7 +50,10 @@ class Project(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['start_date']),
-            models.Index(fields=['end_date']),
+            # Cubre también las búsquedas solo por end_date (proyectos retrasados)
+            models.Index(fields=['end_date', 'status']),
+            # Orden por defecto de las listas y de los proyectos recientes
+            models.Index(fields=['-created_at']),
         ]
     
     def __str__(self):
@@ -64,10 +67,6 @@ class Project(models.Model):
                     'end_date': 'La fecha de finalización debe ser posterior a la fecha de inicio.'
                 })
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
-    
     @property
     def is_active(self):
         """Check if project is currently active."""
@@ -101,10 +100,17 @@ class Project(models.Model):
     
     def get_tasks_count(self):
         """Get total number of tasks in this project."""
+        # Querysets annotated with _tasks_total (e.g. the admin list) skip the COUNT
+        total = getattr(self, '_tasks_total', None)
+        if total is not None:
+            return total
         return self.tasks.count()
     
     def get_completed_tasks_count(self):
         """Get number of completed tasks in this project."""
+        completed = getattr(self, '_tasks_done', None)
+        if completed is not None:
+            return completed
         return self.tasks.filter(status='completed').count()
     
     def get_progress_percentage(self):
@@ -145,6 +151,10 @@ class ProjectAssignment(models.Model):
         verbose_name_plural = 'Asignaciones de Proyectos'
         unique_together = ['project', 'user']
         ordering = ['-assigned_at']
+        # unique_together ya indexa (project, user); este cubre las búsquedas por usuario
+        indexes = [
+            models.Index(fields=['user', 'project'], name='assignment_user_project_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.project.name}"
@@ -1,13 +1,43 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from datetime import date
 
 from .models import Project, ProjectAssignment
 from apps.authentication.serializers import UserSerializer
+from apps.dashboard.signals import bump_projects_version
+from apps.notifications.models import Notification
 
 User = get_user_model()
 
+ASSIGNMENT_BATCH_SIZE = 500
+
+
+def _project_name_exists(serializer, name):
+    """
+    Case-insensitive name lookup for validate_name, memoized per request.
+    
+    The memo lives on the request, so serializers validated repeatedly
+    within one request share a single query per (name, instance).
+    """
+    instance_id = serializer.instance.id if serializer.instance else None
+    key = (name.lower(), instance_id)
+    
+    request = serializer.context.get('request')
+    memo = getattr(request, '_project_name_exists', None)
+    if memo is None:
+        memo = {}
+        if request is not None:
+            request._project_name_exists = memo
+    
+    if key not in memo:
+        queryset = Project.objects.filter(name__iexact=name)
+        if instance_id is not None:
+            queryset = queryset.exclude(id=instance_id)
+        memo[key] = queryset.exists()
+    return memo[key]
+
 
 class ProjectAssignmentSerializer(serializers.ModelSerializer):
     """Serializer for project assignments."""
@@ -73,11 +103,7 @@ class ProjectSerializer(serializers.ModelSerializer):
     
     def validate_name(self, value):
         """Validate project name uniqueness."""
-        queryset = Project.objects.filter(name__iexact=value)
-        if self.instance:
-            queryset = queryset.exclude(id=self.instance.id)
-        
-        if queryset.exists():
+        if _project_name_exists(self, value):
             raise serializers.ValidationError(
                 "Ya existe un proyecto con este nombre."
             )
@@ -136,34 +162,49 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
                         'assignments': f'El usuario {user_id} está duplicado en las asignaciones.'
                     })
                 user_ids.append(user_id)
-                
-                # Validate user exists
-                if not User.objects.filter(id=user_id, is_active=True).exists():
-                    raise serializers.ValidationError({
-                        'assignments': f'Usuario {user_id} no encontrado o inactivo.'
-                    })
-                
-
+            
+            # Validate all users exist with a single IN query
+            valid_ids = set(
+                User.objects.filter(id__in=user_ids, is_active=True).values_list('id', flat=True)
+            )
+            missing_ids = [user_id for user_id in user_ids if int(user_id) not in valid_ids]
+            if missing_ids:
+                raise serializers.ValidationError({
+                    'assignments': f'Usuarios no encontrados o inactivos: {missing_ids}'
+                })
         
         return attrs
     
     def create(self, validated_data):
         """Create project with assignments."""
         assignments_data = validated_data.pop('assignments', [])
+        user = self.context['request'].user
         
         # Set created_by to current user
-        validated_data['created_by'] = self.context['request'].user
+        validated_data['created_by'] = user
         
-        project = Project.objects.create(**validated_data)
+        # The creator is assigned as owner together with the rest of the assignees
+        user_ids = list(dict.fromkeys(
+            [user.pk] + [int(assignment['user_id']) for assignment in assignments_data]
+        ))
         
-        # Create assignments
-        for assignment_data in assignments_data:
-            ProjectAssignment.objects.create(
-                project=project,
-                user_id=assignment_data['user_id'],
-                assigned_by=self.context['request'].user
+        with transaction.atomic():
+            project = Project.objects.create(**validated_data)
+            ProjectAssignment.objects.bulk_create(
+                [
+                    ProjectAssignment(project=project, user_id=user_id, assigned_by=user)
+                    for user_id in user_ids
+                ],
+                batch_size=ASSIGNMENT_BATCH_SIZE
             )
         
+        # bulk_create no envía post_save: invalidar el dashboard y notificar a mano
+        bump_projects_version()
+        transaction.on_commit(
+            lambda: Notification.create_project_assigned_notifications(project, user_ids, user),
+            robust=True
+        )
+        
         return project
 
 
@@ -197,11 +238,7 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
     
     def validate_name(self, value):
         """Validate project name uniqueness."""
-        queryset = Project.objects.filter(name__iexact=value)
-        if self.instance:
-            queryset = queryset.exclude(id=self.instance.id)
-        
-        if queryset.exists():
+        if _project_name_exists(self, value):
             raise serializers.ValidationError(
                 "Ya existe un proyecto con este nombre."
             )
@@ -213,7 +250,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
     """Simplified serializer for project lists."""
     
     created_by = serializers.StringRelatedField()
-    progress_percentage = serializers.ReadOnlyField()
+    progress_percentage = serializers.FloatField(source='get_progress_percentage', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     days_remaining = serializers.ReadOnlyField()
     total_tasks = serializers.SerializerMethodField()
@@ -233,33 +270,95 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'pending_tasks', 'overdue_tasks', 'total_members'
         )
     
+    # The list querysets annotate these counters (see ProjectViewSet.get_queryset);
+    # un-annotated instances fall back to one COUNT per field
     def get_total_tasks(self, obj):
         """Get total number of tasks in project."""
-        return obj.tasks.count()
+        count = getattr(obj, 'total_tasks', None)
+        return obj.tasks.count() if count is None else count
     
     def get_completed_tasks(self, obj):
         """Get number of completed tasks in project."""
-        return obj.tasks.filter(status='completed').count()
+        count = getattr(obj, 'completed_tasks', None)
+        return obj.tasks.filter(status='completed').count() if count is None else count
     
     def get_in_progress_tasks(self, obj):
         """Get number of in progress tasks in project."""
-        return obj.tasks.filter(status='in_progress').count()
+        count = getattr(obj, 'in_progress_tasks', None)
+        return obj.tasks.filter(status='in_progress').count() if count is None else count
     
     def get_pending_tasks(self, obj):
         """Get number of pending tasks in project."""
-        return obj.tasks.filter(status='pending').count()
+        count = getattr(obj, 'pending_tasks', None)
+        return obj.tasks.filter(status='pending').count() if count is None else count
     
     def get_overdue_tasks(self, obj):
         """Get number of overdue tasks in project."""
-        from datetime import date
-        return obj.tasks.filter(
-            due_date__lt=date.today(),
-            status__in=['pending', 'in_progress']
-        ).count()
+        count = getattr(obj, 'overdue_tasks', None)
+        if count is None:
+            count = obj.tasks.filter(
+                due_date__lt=date.today(),
+                status__in=['pending', 'in_progress']
+            ).count()
+        return count
     
     def get_total_members(self, obj):
         """Get total number of members in project."""
-        return obj.assignments.count()
+        count = getattr(obj, 'total_members', None)
+        return obj.assignments.count() if count is None else count
+
+
+# Columnas y contadores anotados que project_list_rows() lee de values()
+PROJECT_LIST_VALUES = (
+    'id', 'name', 'description', 'status', 'start_date', 'end_date', 'created_at',
+    'created_by__first_name', 'created_by__last_name', 'created_by__email',
+    'total_tasks', 'completed_tasks', 'in_progress_tasks', 'pending_tasks',
+    'overdue_tasks', 'total_members',
+)
+
+_datetime_field = serializers.DateTimeField()
+
+
+def project_list_rows(rows):
+    """
+    Build ProjectListSerializer's output from ``values(*PROJECT_LIST_VALUES)`` rows.
+    
+    The list endpoints only map annotated rows to JSON, so this skips model
+    instances and DRF field dispatch entirely. The derived fields come from
+    the annotated counters and a single ``today`` per call.
+    """
+    today = timezone.now().date()
+    completed = Project.Status.COMPLETED
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'status': row['status'],
+            'start_date': row['start_date'].isoformat(),
+            'end_date': row['end_date'].isoformat(),
+            # Mismo formato que User.__str__
+            'created_by': f"{row['created_by__first_name']} {row['created_by__last_name']} ({row['created_by__email']})",
+            'created_at': _datetime_field.to_representation(row['created_at']),
+            # Mismo cálculo que Project.get_progress_percentage, con los contadores anotados
+            # (siempre float, como el FloatField del serializer: 0.0, no 0)
+            'progress_percentage': (
+                round(row['completed_tasks'] / row['total_tasks'] * 100, 2) if row['total_tasks'] else 0.0
+            ),
+            'is_overdue': row['status'] != completed and today > row['end_date'],
+            'days_remaining': (
+                0 if row['status'] == completed or today > row['end_date']
+                else (row['end_date'] - today).days
+            ),
+            'total_tasks': row['total_tasks'],
+            'completed_tasks': row['completed_tasks'],
+            'in_progress_tasks': row['in_progress_tasks'],
+            'pending_tasks': row['pending_tasks'],
+            'overdue_tasks': row['overdue_tasks'],
+            'total_members': row['total_members'],
+        }
+        for row in rows
+    ]
 
 
 class ProjectStatsSerializer(serializers.Serializer):
@@ -280,25 +379,8 @@ class AssignUserToProjectSerializer(serializers.Serializer):
     
     def validate_user_id(self, value):
         """Validate user exists and is active."""
-        try:
-            user = User.objects.get(id=value, is_active=True)
-        except User.DoesNotExist:
+        if not User.objects.filter(id=value, is_active=True).exists():
             raise serializers.ValidationError(
                 "Usuario no encontrado o inactivo."
             )
         return value
-    
-    def validate(self, attrs):
-        """Validate assignment doesn't already exist."""
-        project = self.context['project']
-        user_id = attrs['user_id']
-        
-        if ProjectAssignment.objects.filter(
-            project=project,
-            user_id=user_id
-        ).exists():
-            raise serializers.ValidationError(
-                "El usuario ya está asignado a este proyecto."
-            )
-        
-        return attrs
\ No newline at end of file
@@ -1,3 +1,97 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.tasks.models import Task
+
+from .models import Project, ProjectAssignment
+from .serializers import ProjectListSerializer, project_list_rows
+from .views import _for_list
+
+User = get_user_model()
+
+
+class ProjectListRowsTests(TestCase):
+    """project_list_rows() must render exactly what ProjectListSerializer renders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pw12345!',
+            first_name='Ada', last_name='Admin'
+        )
+        member = User.objects.create_user(
+            username='member', email='member@example.com', password='pw12345!',
+            first_name='Max', last_name='Member'
+        )
+        today = timezone.localdate()
+
+        # Tareas en cada estado, una vencida, y dos miembros
+        cls.busy = Project.objects.create(
+            name='Con tareas', description='Descripción', created_by=cls.admin,
+            status=Project.Status.IN_PROGRESS,
+            start_date=today - timedelta(days=10), end_date=today + timedelta(days=20)
+        )
+        for user in (cls.admin, member):
+            ProjectAssignment.objects.create(project=cls.busy, user=user, assigned_by=cls.admin)
+        for status in ('completed', 'in_progress', 'pending'):
+            Task.objects.create(
+                name=f'Tarea {status}', description='Descripción', project=cls.busy,
+                created_by=cls.admin, status=status, due_date=timezone.now() + timedelta(days=1)
+            )
+        Task.objects.filter(project=cls.busy, status='pending').update(
+            due_date=timezone.now() - timedelta(days=2)
+        )
+
+        # Sin tareas (progreso 0) y ya vencido
+        cls.empty_overdue = Project.objects.create(
+            name='Vacío', description='Descripción', created_by=cls.admin,
+            start_date=today - timedelta(days=30), end_date=today - timedelta(days=1)
+        )
+        cls.completed = Project.objects.create(
+            name='Completado', description='Descripción', created_by=cls.admin,
+            status=Project.Status.COMPLETED,
+            start_date=today - timedelta(days=30), end_date=today - timedelta(days=1)
+        )
+        cls.projects = (cls.busy, cls.empty_overdue, cls.completed)
+
+    def assertSameJSON(self, row, instance):
+        expected = ProjectListSerializer(instance).data
+        self.assertEqual(list(row), list(expected))
+        self.assertEqual(row, expected)
+        # Compares the rendered JSON too, so 0 vs 0.0 or date vs string mismatches fail
+        self.assertEqual(JSONRenderer().render(row), JSONRenderer().render(expected))
+
+    def test_rows_match_serializer(self):
+        for project in self.projects:
+            with self.subTest(project=project.name):
+                row, = project_list_rows(_for_list(Project.objects.filter(pk=project.pk)))
+                self.assertSameJSON(row, Project.objects.get(pk=project.pk))
+
+    def test_annotated_counters_and_progress(self):
+        row, = project_list_rows(_for_list(Project.objects.filter(pk=self.busy.pk)))
+
+        self.assertEqual(row['total_tasks'], 3)
+        self.assertEqual(row['completed_tasks'], 1)
+        self.assertEqual(row['in_progress_tasks'], 1)
+        self.assertEqual(row['pending_tasks'], 1)
+        self.assertEqual(row['overdue_tasks'], 1)
+        self.assertEqual(row['total_members'], 2)
+        self.assertEqual(row['progress_percentage'], 33.33)
+
+    def test_list_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get('/api/projects/')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        rows = {row['id']: row for row in response.data['results']}
+        self.assertEqual(set(rows), {project.pk for project in self.projects})
+        for project in self.projects:
+            with self.subTest(project=project.name):
+                self.assertSameJSON(rows[project.pk], Project.objects.get(pk=project.pk))
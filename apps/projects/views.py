@@ -1,6 +1,9 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
@@ -11,12 +14,44 @@ from .models import Project, ProjectAssignment
 from .serializers import (
     ProjectSerializer, ProjectCreateSerializer, ProjectUpdateSerializer,
     ProjectListSerializer, ProjectStatsSerializer, ProjectAssignmentSerializer,
-    AssignUserToProjectSerializer
+    AssignUserToProjectSerializer, PROJECT_LIST_VALUES, project_list_rows
 )
+from apps.dashboard.signals import PROJECTS_VERSION_KEY
 from apps.shared.permissions import (
     IsProjectMember, IsProjectManagerOrReadOnly, CanManageProjectAssignments
 )
 
+# Los contadores de tareas de recent_projects pueden ir hasta este tiempo por detrás
+PROJECT_DASHBOARD_CACHE_TIMEOUT = 60  # seconds
+
+
+# Acciones de detalle que solo necesitan la fila del proyecto, sin relaciones
+PROJECT_ROW_ACTIONS = (
+    'assignments', 'assign_user', 'update_assignment', 'remove_assignment', 'tasks', 'stats',
+)
+
+
+def _task_counts():
+    """Task/member counters per project, for annotate() or aggregate()."""
+    return {
+        'total_tasks': Count('tasks', distinct=True),
+        'completed_tasks': Count('tasks', filter=Q(tasks__status='completed'), distinct=True),
+        'in_progress_tasks': Count('tasks', filter=Q(tasks__status='in_progress'), distinct=True),
+        'pending_tasks': Count('tasks', filter=Q(tasks__status='pending'), distinct=True),
+        'overdue_tasks': Count('tasks', filter=Q(
+            tasks__due_date__lt=date.today(),
+            tasks__status__in=['pending', 'in_progress']
+        ), distinct=True),
+        'total_members': Count('assignments', distinct=True),
+    }
+
+
+def _for_list(queryset):
+    """Project rows for project_list_rows(): list columns plus task/member counters."""
+    return queryset.annotate(**_task_counts()).values(
+        *PROJECT_LIST_VALUES
+    ).order_by(*Project._meta.ordering)  # Meta.ordering no aplica a consultas con GROUP BY
+
 
 @extend_schema_view(
     list=extend_schema(tags=['Gestión de Proyectos'], summary='Listar proyectos'),
@@ -46,16 +81,22 @@ class ProjectViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.is_superuser:
-            return Project.objects.all().select_related('created_by').prefetch_related(
-                'assignments__user', 'tasks'
+            queryset = Project.objects.all()
+        else:
+            # Get projects where user is assigned (semijoin, so the assignments
+            # join below still counts every member of the project)
+            queryset = Project.objects.filter(
+                id__in=ProjectAssignment.objects.filter(user=user).values('project_id')
             )
         
-        # Get projects where user is assigned
-        return Project.objects.filter(
-            assignments__user=user
-        ).select_related('created_by').prefetch_related(
-            'assignments__user', 'tasks'
-        ).distinct()
+        # Las listas solo muestran contadores; las asignaciones completas
+        # solo se cargan para el detalle, que las anida
+        if self.action in ['list', 'my_projects']:
+            return _for_list(queryset)
+        queryset = queryset.select_related('created_by')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('assignments__user')
+        return queryset
     
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -67,6 +108,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return ProjectListSerializer
         return ProjectSerializer
     
+    def list(self, request, *args, **kwargs):
+        """List projects from annotated values() rows."""
+        rows = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(project_list_rows(page))
+        return Response(project_list_rows(rows))
+    
     def get_permissions(self):
         """Get permissions based on action."""
         if self.action in ['update', 'partial_update', 'destroy']:
@@ -79,19 +128,30 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def get_project(self):
         """Helper method to get project for permission checks."""
         if hasattr(self, 'kwargs') and 'pk' in self.kwargs:
-            return get_object_or_404(Project, pk=self.kwargs['pk'])
+            # Memoized: the permission classes and get_object() share one lookup
+            if not hasattr(self, '_project'):
+                self._project = get_object_or_404(
+                    Project.objects.select_related('created_by'), pk=self.kwargs['pk']
+                )
+            return self._project
         return None
     
+    def get_object(self):
+        """Reuse the project loaded by the permission checks in custom actions."""
+        if self.action not in PROJECT_ROW_ACTIONS:
+            return super().get_object()
+        
+        # has_permission ya validó la pertenencia (o la gestión) del proyecto,
+        # lo mismo que el filtro de get_queryset
+        project = self.get_project()
+        self.check_object_permissions(self.request, project)
+        return project
+    
     def perform_create(self, serializer):
         """Create project and assign creator as owner."""
-        project = serializer.save(created_by=self.request.user)
-        
-        # Assign creator as project owner
-        ProjectAssignment.objects.create(
-            project=project,
-            user=self.request.user,
-            assigned_by=self.request.user
-        )
+        # ProjectCreateSerializer.create inserts the creator's assignment
+        # in the same bulk INSERT as the other assignees
+        serializer.save(created_by=self.request.user)
     
     @extend_schema(tags=['Gestión de Proyectos'], summary='Obtener asignaciones del proyecto')
     @action(detail=True, methods=['get'])
@@ -113,11 +173,20 @@ class ProjectViewSet(viewsets.ModelViewSet):
         )
         
         if serializer.is_valid():
-            assignment = ProjectAssignment.objects.create(
-                project=project,
-                user_id=serializer.validated_data['user_id'],
-                assigned_by=request.user
-            )
+            # La restricción única (project, user) resuelve los duplicados sin
+            # consulta previa y también entre asignaciones concurrentes
+            try:
+                with transaction.atomic():
+                    assignment = ProjectAssignment.objects.create(
+                        project=project,
+                        user_id=serializer.validated_data['user_id'],
+                        assigned_by=request.user
+                    )
+            except IntegrityError:
+                return Response(
+                    {'non_field_errors': ['El usuario ya está asignado a este proyecto.']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             response_serializer = ProjectAssignmentSerializer(assignment)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
@@ -187,87 +256,85 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """Get project statistics."""
         project = self.get_object()
         
-        # Task statistics
-        tasks = project.tasks.all()
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='completed').count()
-        in_progress_tasks = tasks.filter(status='in_progress').count()
-        pending_tasks = tasks.filter(status='pending').count()
-        overdue_tasks = tasks.filter(
-            due_date__lt=date.today(),
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        # Assignment statistics
-        total_members = project.assignments.count()
+        # Task and assignment statistics in a single aggregate query
+        stats_data = Project.objects.filter(pk=project.pk).aggregate(**_task_counts())
         
         # Progress calculation
-        progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        total_tasks = stats_data['total_tasks']
+        progress = (stats_data['completed_tasks'] / total_tasks * 100) if total_tasks > 0 else 0
         
-        stats_data = {
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'pending_tasks': pending_tasks,
-            'overdue_tasks': overdue_tasks,
-            'total_members': total_members,
+        stats_data.update({
             'progress_percentage': round(progress, 2),
             'is_overdue': project.is_overdue,
             'days_remaining': project.days_remaining
-        }
+        })
         
         return Response(stats_data)
     
-    @extend_schema(tags=['Gestión de Proyectos'], summary='Obtener mis proyectos')
+    @extend_schema(tags=['Gestión de Proyectos'], summary='Obtener mis proyectos', responses=ProjectListSerializer(many=True))
     @action(detail=False, methods=['get'])
     def my_projects(self, request):
         """Get current user's projects."""
         user = request.user
-        projects = self.get_queryset().filter(
-            Q(created_by=user) | Q(assignments__user=user)
-        ).distinct()
+        # UNION de dos ramas estrechas (cada una por su índice) en vez de un OR
+        my_project_ids = Project.objects.filter(created_by=user).order_by().values('id').union(
+            ProjectAssignment.objects.filter(user=user).order_by().values('project_id')
+        )
+        projects = self.get_queryset().filter(id__in=my_project_ids)
         
-        serializer = ProjectListSerializer(projects, many=True)
-        return Response(serializer.data)
+        return Response(project_list_rows(projects))
     
-    @extend_schema(tags=['Gestión de Proyectos'], summary='Obtener estadísticas del dashboard')
+    @extend_schema(tags=['Gestión de Proyectos'], summary='Obtener estadísticas del dashboard', responses=ProjectStatsSerializer)
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get dashboard statistics for projects."""
         user = request.user
         
+        if not settings.SHARED_CACHE:
+            # Un cambio de versión en un worker no llega a la caché de los demás
+            return Response(self._compute_dashboard_stats(user))
+        
+        # Cachear por usuario; los cambios en proyectos o asignaciones cambian la versión
+        version = cache.get(PROJECTS_VERSION_KEY, 0)
+        cache_key = f'project_dash:{user.pk}:{user.is_superuser}:{version}'
+        stats = cache.get_or_set(
+            cache_key,
+            lambda: self._compute_dashboard_stats(user),
+            PROJECT_DASHBOARD_CACHE_TIMEOUT
+        )
+        return Response(stats)
+    
+    def _compute_dashboard_stats(self, user):
+        """Aggregate the dashboard stats of the projects visible to the user."""
         if user.is_superuser:
             projects = Project.objects.all()
         else:
-            projects = Project.objects.filter(assignments__user=user).distinct()
+            projects = Project.objects.filter(
+                id__in=ProjectAssignment.objects.filter(user=user).values('project_id')
+            )
         
-        total_projects = projects.count()
-        active_projects = projects.filter(status='active').count()
-        completed_projects = projects.filter(status='completed').count()
-        overdue_projects = projects.filter(
-            end_date__lt=date.today(),
-            status__in=['active', 'planning']
-        ).count()
+        # Todos los contadores en una sola consulta con agregación condicional
+        stats_data = projects.aggregate(
+            total_projects=Count('id'),
+            active_projects=Count('id', filter=Q(status=Project.Status.IN_PROGRESS)),
+            completed_projects=Count('id', filter=Q(status=Project.Status.COMPLETED)),
+            overdue_projects=Count('id', filter=Q(
+                end_date__lt=date.today(),
+                status__in=[Project.Status.PENDING, Project.Status.IN_PROGRESS]
+            )),
+        )
         
         # Projects by status
-        projects_by_status = dict(
+        stats_data['projects_by_status'] = dict(
             projects.values('status').annotate(
                 count=Count('id')
             ).values_list('status', 'count')
         )
         
         # Recent projects
-        recent_projects = projects.order_by('-created_at')[:5]
-        
-        stats_data = {
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'completed_projects': completed_projects,
-            'overdue_projects': overdue_projects,
-            'projects_by_status': projects_by_status,
-            'recent_projects': ProjectListSerializer(recent_projects, many=True).data
-        }
+        stats_data['recent_projects'] = project_list_rows(
+            _for_list(projects).order_by('-created_at')[:5]
+        )
         
-        serializer = ProjectStatsSerializer(data=stats_data)
-        serializer.is_valid()
-        return Response(serializer.data)
\ No newline at end of file
+        # Mismo formato que ProjectStatsSerializer, sin pasar los proyectos por DRF
+        return stats_data
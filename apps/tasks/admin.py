@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.utils import timezone
 from django.db import models
 
+from apps.projects.models import ProjectAssignment
 from .models import Task, TaskComment
 
 
@@ -58,12 +59,6 @@ class TaskAdmin(admin.ModelAdmin):
     autocomplete_fields = ['project', 'assigned_to', 'created_by']
     inlines = [TaskCommentInline]
     
-    def get_queryset(self, request):
-        """Optimize queryset for admin list view."""
-        return super().get_queryset(request).select_related(
-            'project', 'assigned_to', 'created_by'
-        ).prefetch_related('comments')
-    
     def is_overdue_display(self, obj):
         """Display if task is overdue."""
         if obj.is_overdue:
@@ -98,15 +93,20 @@ class TaskAdmin(admin.ModelAdmin):
         return filters
     
     def get_queryset(self, request):
-        """Filter queryset based on user permissions."""
-        qs = super().get_queryset(request)
+        """Optimize queryset for admin list view and filter it by user permissions."""
+        # Related objects shown in list_display; the comments inline loads its own rows
+        qs = super().get_queryset(request).select_related(
+            'project', 'assigned_to', 'created_by'
+        )
         if not request.user.is_superuser:
             # Non-superusers see only tasks they created, are assigned to, or in projects they're assigned to
             qs = qs.filter(
                 models.Q(created_by=request.user) |
                 models.Q(assigned_to=request.user) |
-                models.Q(project__assignments__user=request.user)
-            ).distinct()
+                models.Q(project__in=ProjectAssignment.objects.filter(
+                    user=request.user
+                ).values('project_id'))
+            )
         return qs
 
 
@@ -140,12 +140,6 @@ class TaskCommentAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
     autocomplete_fields = ['task', 'author']
     
-    def get_queryset(self, request):
-        """Optimize queryset for admin list view."""
-        return super().get_queryset(request).select_related(
-            'task', 'task__project', 'author'
-        )
-    
     def content_preview(self, obj):
         """Display a preview of the comment content."""
         if len(obj.content) > 50:
@@ -170,14 +164,18 @@ class TaskCommentAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
     
     def get_queryset(self, request):
-        """Filter queryset based on user permissions."""
-        qs = super().get_queryset(request)
+        """Optimize queryset for admin list view and filter it by user permissions."""
+        qs = super().get_queryset(request).select_related(
+            'task', 'task__project', 'author'
+        )
         if not request.user.is_superuser:
             # Non-superusers see only comments on tasks they have access to
             qs = qs.filter(
                 models.Q(task__created_by=request.user) |
                 models.Q(task__assigned_to=request.user) |
-                models.Q(task__project__assignments__user=request.user) |
+                models.Q(task__project__in=ProjectAssignment.objects.filter(
+                    user=request.user
+                ).values('project_id')) |
                 models.Q(author=request.user)
-            ).distinct()
+            )
         return qs
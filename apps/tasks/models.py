@@ -4,6 +4,17 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 
+class TaskQuerySet(models.QuerySet):
+    
+    def delete(self):
+        """Delete tasks, invalidating the unread counts of their notifications' recipients."""
+        # notifications.models imports this module
+        from apps.notifications.models import Notification
+        
+        Notification.invalidate_unread_count_before_delete(models.Q(related_task__in=self))
+        return super().delete()
+
+
 class Task(models.Model):
     """Model for managing tasks within projects."""
     
@@ -69,6 +80,10 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Sin pre_delete en Task: el borrado en cascada de un proyecto sigue
+    # siendo un DELETE rápido de sus tareas
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         db_table = 'tasks_task'
         verbose_name = 'Tarea'
@@ -78,7 +93,8 @@ class Task(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['priority']),
             models.Index(fields=['due_date']),
-            models.Index(fields=['assigned_to']),
+            # Cubre también las búsquedas solo por assigned_to
+            models.Index(fields=['assigned_to', 'status']),
             models.Index(fields=['project']),
         ]
     
@@ -122,6 +138,12 @@ class Task(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
     
+    def delete(self, *args, **kwargs):
+        from apps.notifications.models import Notification
+        
+        Notification.invalidate_unread_count_before_delete(models.Q(related_task=self))
+        return super().delete(*args, **kwargs)
+    
     @property
     def is_overdue(self):
         """Check if task is overdue."""
@@ -453,15 +453,9 @@ class CommentViewSet(viewsets.ModelViewSet):
                 )
                 
                 if serializer.is_valid():
+                    # Las notificaciones a los participantes las crea el post_save de TaskComment
                     comment = serializer.save()
                     
-                    # Create notifications for task participants
-                    try:
-                        Notification.create_comment_notification(comment)
-                    except Exception as e:
-                        # Log error but don't fail comment creation
-                        print(f"Error creating comment notification: {e}")
-                    
                     response_serializer = CommentSerializer(comment)
                     return Response(response_serializer.data, status=status.HTTP_201_CREATED)
                 
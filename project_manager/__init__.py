@@ -0,0 +1,7 @@
+# Celery is optional (not installed on PythonAnywhere); tasks fall back to running inline
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -26,7 +26,10 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = [
     'rest_framework',
+    'adrf',
     'rest_framework_simplejwt',
+    # Blacklist de refresh tokens en BD cuando no hay caché compartida
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'drf_spectacular',
@@ -88,8 +91,17 @@ if DB_ENGINE == 'django.db.backends.postgresql':
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            # Reutilizar la conexión entre peticiones (0 = cerrar al terminar cada petición).
+            # Solo sirve bajo WSGI: con ASGI cada petición corre en otro hilo y las
+            # conexiones persistentes se acumulan, así que el despliegue ASGI usa 0
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            # Requerido detrás de PgBouncer en modo transaction pooling
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
         }
     }
+    # Trigram lookups/indexes used by the admin search
+    INSTALLED_APPS += ['django.contrib.postgres']
 else:
     DATABASES = {
         'default': {
@@ -328,6 +340,22 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Cache Configuration
+# Redis compartido entre workers (blacklist de JWT, caché de permisos/dashboard);
+# sin CACHE_REDIS_URL se usa la caché en memoria local de cada proceso
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+
+# Los datos que deben ser coherentes entre workers (contador de no leídas,
+# blacklist de refresh tokens) solo se guardan en caché si es compartida
+SHARED_CACHE = bool(CACHE_REDIS_URL)
+
 # Celery Configuration (for notifications)
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -335,6 +363,8 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Ejecutar las tareas en el propio proceso (desarrollo sin Redis/worker)
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
 
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')